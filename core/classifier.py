@@ -3,6 +3,7 @@ VAT quarter classifier based on configurable company calendars.
 Supports UAE TRN calendar and extensible to other calendars.
 """
 
+import functools
 import json
 import logging
 import os
@@ -13,6 +14,27 @@ logger = logging.getLogger(__name__)
 
 _CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', 'config')
 
+# UAE TRN calendar, indexed by month - 1: quarter label and year offset
+# (January belongs to Q4 of the previous year)
+_UAE_TRN_QUARTER = ('Q4', 'Q1', 'Q1', 'Q1', 'Q2', 'Q2', 'Q2', 'Q3', 'Q3', 'Q3', 'Q4', 'Q4')
+_UAE_TRN_YEAR_DELTA = (-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(path: str, mtime_ns: int, size: int) -> Tuple[dict, str]:
+    """Parse companies.json once per (path, mtime, size). Result is shared: do not mutate."""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    companies = {c["id"]: c for c in config.get("companies", [])}
+    return companies, config.get("default_company", "")
+
+
+def _load_config(config_path: str) -> Tuple[dict, str]:
+    """Return (companies_by_id, default_company), re-reading only when the file changed."""
+    path = os.path.abspath(config_path)
+    st = os.stat(path)
+    return _load_config_cached(path, st.st_mtime_ns, st.st_size)
+
 
 class VATQuarterClassifier:
     """Determines VAT quarter from invoice date using company-specific calendars."""
@@ -20,10 +42,9 @@ class VATQuarterClassifier:
     def __init__(self, config_path: Optional[str] = None):
         if config_path is None:
             config_path = os.path.join(_CONFIG_DIR, 'companies.json')
-        with open(config_path, encoding='utf-8') as f:
-            config = json.load(f)
-        self.companies = {c["id"]: c for c in config.get("companies", [])}
-        self.default_company = config.get("default_company", "")
+        companies, default_company = _load_config(config_path)
+        self.companies = dict(companies)
+        self.default_company = default_company
 
     def classify(self, invoice_date: date, company_id: Optional[str] = None) -> Optional[str]:
         """
@@ -50,18 +71,5 @@ class VATQuarterClassifier:
 
     def _default_uae_trn(self, invoice_date: date) -> str:
         """UAE TRN VAT quarter classification."""
-        month = invoice_date.month
-        year = invoice_date.year
-
-        if 2 <= month <= 4:
-            return f"Q1-{year}"
-        elif 5 <= month <= 7:
-            return f"Q2-{year}"
-        elif 8 <= month <= 10:
-            return f"Q3-{year}"
-        else:
-            # Nov, Dec = Q4 of current year; Jan = Q4 of previous year
-            if month == 1:
-                return f"Q4-{year - 1}"
-            else:
-                return f"Q4-{year}"
+        i = invoice_date.month - 1
+        return f"{_UAE_TRN_QUARTER[i]}-{invoice_date.year + _UAE_TRN_YEAR_DELTA[i]}"
@@ -13,15 +13,29 @@ Usage:
   # Download a file
   path = connector.download(file_id="1XyZ...", dest_dir="/tmp")
 
+  # Download a small file into memory
+  data = connector.download_bytes(file_id="1XyZ...")
+
+  # Download several files concurrently
+  paths = connector.download_many(["1XyZ...", "1AbC..."], dest_dir="/tmp")
+
   # Rename a file in Drive
   connector.rename(file_id="1XyZ...", new_name="AWS_#123_01-02-2025_500USD.pdf")
+
+  # Rename / move many files with batched metadata requests
+  connector.rename_many({"1XyZ...": "AWS_#123_01-02-2025_500USD.pdf"})
+  connector.move_many(["1XyZ..."], target_folder_id="1Done...")
 """
 
-import io
+import itertools
 import logging
 import os
+import random
 import tempfile
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -37,26 +51,124 @@ INVOICE_MIMES = {
     'image/bmp',
 }
 
+# Use the discovery document bundled with google-api-python-client and skip
+# the discovery-cache autodetection (App Engine / oauth2client probes)
+_BUILD_OPTIONS = {'static_discovery': True, 'cache_discovery': False}
+
+# Query clause matching INVOICE_MIMES (sorted so the query text is stable)
+_INVOICE_MIME_FILTER = " or ".join(f"mimeType='{m}'" for m in sorted(INVOICE_MIMES))
+
+# Files per files().list page (Drive maximum)
+LIST_PAGE_SIZE = 1000
+
+# Concurrent downloads in download_many (Drive has no batch endpoint for media)
+DOWNLOAD_MAX_WORKERS = 8
+
+# Media download chunk size: invoices complete in one request,
+# larger scans stream to disk without being held in memory
+DOWNLOAD_CHUNK_SIZE = 10 * 1024 * 1024
+
+# Metadata operations per batch HTTP request (larger batches trigger 500s)
+BATCH_MAX_SIZE = 25
+
+# Transient Drive errors retried with jittered exponential backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+
 _CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', 'config')
 _TOKEN_PATH = os.path.join(_CONFIG_DIR, 'drive_token.json')
 _CREDENTIALS_PATH = os.path.join(_CONFIG_DIR, 'credentials.json')
 
+# Built Drive services, per thread and credential source (see _build_service)
+_service_cache = threading.local()
+
+# Loaded credentials, per credential source, shared by every thread. The lock
+# also serializes the OAuth refresh / consent flow and the token file write.
+_credentials_cache: dict = {}
+_credentials_lock = threading.Lock()
+
+
+def _execute_with_retry(request, max_retries: int = MAX_RETRIES):
+    """
+    Execute a Drive API request, retrying rate limits (429) and transient
+    server errors with jittered exponential backoff. Honors Retry-After.
+    """
+    from googleapiclient.errors import HttpError
+
+    delay = 1.0
+    for attempt in range(max_retries + 1):
+        try:
+            return request.execute()
+        except HttpError as e:
+            status = getattr(e.resp, 'status', None)
+            if status not in RETRY_STATUSES or attempt == max_retries:
+                raise
+            wait = _retry_wait(e.resp, delay)
+            logger.warning("Drive: HTTP %s, retrying in %.1fs (%d/%d)", status, wait, attempt + 1, max_retries)
+            time.sleep(wait)
+            delay *= 2
+
+
+def _retry_wait(resp, delay: float) -> float:
+    """Seconds to wait before a retry: Retry-After if given, else jittered delay."""
+    retry_after = resp.get('retry-after', '')
+    return float(retry_after) if retry_after.isdigit() else delay + random.random()
+
 
 class DriveConnector:
     """Google Drive connector for listing, downloading, and renaming invoice files."""
 
     def __init__(self, credentials_path: Optional[str] = None):
+        self._credentials_path = credentials_path
         self.service = self._build_service(credentials_path)
 
     @staticmethod
     def _build_service(credentials_path: Optional[str] = None):
         """
-        Build Drive API service with auto-detected credentials:
-        1. Service account (GOOGLE_APPLICATION_CREDENTIALS env var)
-        2. OAuth2 user flow (config/credentials.json + cached token)
+        Return a Drive API service for the calling thread.
+
+        Services are cached per thread and credential source, so later
+        connectors reuse the authorized httplib2.Http and its keep-alive
+        connection. googleapiclient services are not thread-safe, hence one
+        per thread; worker threads are short-lived, so what they share is
+        the credentials (see _get_credentials): a new thread only builds a
+        service from the bundled discovery document, without re-running auth.
         """
+        services = getattr(_service_cache, 'services', None)
+        if services is None:
+            services = _service_cache.services = {}
+        key = (os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'), credentials_path)
+        service = services.get(key)
+        if service is None:
+            service = services[key] = DriveConnector._create_service(credentials_path)
+        return service
+
+    @staticmethod
+    def _create_service(credentials_path: Optional[str] = None):
+        """Build a Drive API service on the shared credentials."""
         from googleapiclient.discovery import build
 
+        creds = DriveConnector._get_credentials(credentials_path)
+        return build('drive', 'v3', credentials=creds, **_BUILD_OPTIONS)
+
+    @staticmethod
+    def _get_credentials(credentials_path: Optional[str] = None):
+        """Return the credentials for this source, loading them once per process."""
+        key = (os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'), credentials_path)
+        with _credentials_lock:
+            creds = _credentials_cache.get(key)
+            if creds is None:
+                creds = _credentials_cache[key] = DriveConnector._load_credentials(credentials_path)
+        return creds
+
+    @staticmethod
+    def _load_credentials(credentials_path: Optional[str] = None):
+        """
+        Load Drive credentials, auto-detected:
+        1. Service account (GOOGLE_APPLICATION_CREDENTIALS env var)
+        2. OAuth2 user flow (config/credentials.json + cached token)
+        Caller holds _credentials_lock.
+        """
         # Try service account first (Cloud Functions / server)
         if os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'):
             from google.oauth2 import service_account
@@ -65,7 +177,7 @@ class DriveConnector:
                 scopes=SCOPES,
             )
             logger.info("Drive: authenticated via service account")
-            return build('drive', 'v3', credentials=creds)
+            return creds
 
         # OAuth2 user flow (local CLI)
         from google.oauth2.credentials import Credentials
@@ -97,31 +209,43 @@ class DriveConnector:
             logger.info("Drive: OAuth token cached")
 
         logger.info("Drive: authenticated via OAuth2")
-        return build('drive', 'v3', credentials=creds)
+        return creds
 
     def list_invoices(
         self,
         folder_id: str,
-        max_results: int = 100,
+        max_results: Optional[int] = None,
     ) -> list[dict]:
         """
-        List invoice files (PDF, images) in a Drive folder.
-        Returns list of {id, name, mimeType, modifiedTime}.
+        List invoice files (PDF, images) in a Drive folder, newest first.
+        Returns list of {id, name, mimeType, modifiedTime, parents, size}, all pages unless
+        max_results is given.
         """
-        mime_filter = " or ".join(f"mimeType='{m}'" for m in INVOICE_MIMES)
-        query = f"'{folder_id}' in parents and ({mime_filter}) and trashed=false"
-
-        results = self.service.files().list(
-            q=query,
-            pageSize=max_results,
-            fields="files(id, name, mimeType, modifiedTime)",
-            orderBy="modifiedTime desc",
-        ).execute()
-
-        files = results.get('files', [])
-        logger.info(f"Drive: found {len(files)} invoice(s) in folder {folder_id}")
+        files = list(itertools.islice(self.iter_invoices(folder_id), max_results))
+        logger.info("Drive: found %d invoice(s) in folder %s", len(files), folder_id)
         return files
 
+    def iter_invoices(self, folder_id: str) -> Iterator[dict]:
+        """
+        Yield invoice files in a Drive folder page by page, following
+        nextPageToken, so callers can start work before listing finishes.
+        """
+        query = f"'{folder_id}' in parents and ({_INVOICE_MIME_FILTER}) and trashed=false"
+
+        page_token = None
+        while True:
+            results = _execute_with_retry(self.service.files().list(
+                q=query,
+                pageSize=LIST_PAGE_SIZE,
+                pageToken=page_token,
+                fields="nextPageToken, files(id, name, mimeType, modifiedTime, parents, size)",
+                orderBy="modifiedTime desc",
+            ))
+            yield from results.get('files', [])
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
     def download(
         self,
         file_id: str,
@@ -130,13 +254,53 @@ class DriveConnector:
     ) -> str:
         """
         Download a file from Drive to a local path.
-        Returns the local file path.
+        Returns the local file path. Safe to call from worker threads:
+        each thread uses its own cached Drive service.
+        """
+        service = self._build_service(self._credentials_path)
+        return self._download(service, file_id, dest_dir, filename)
+
+    def download_many(
+        self,
+        file_ids: list[str],
+        dest_dir: Optional[str] = None,
+        max_workers: int = DOWNLOAD_MAX_WORKERS,
+    ) -> list[str]:
+        """
+        Download several files concurrently into dest_dir.
+        Returns local paths in the same order as file_ids.
+        """
+        if dest_dir is None:
+            dest_dir = tempfile.mkdtemp(prefix="invoice_")
+
+        def _one(file_id: str) -> str:
+            return self._download(self._build_service(self._credentials_path), file_id, dest_dir)
+
+        workers = max(1, min(max_workers, len(file_ids)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drive-dl") as pool:
+            return list(pool.map(_one, file_ids))
+
+    def download_bytes(self, file_id: str) -> bytes:
         """
+        Download a small file's content into memory in a single request.
+        Thread-safe like download(); use download() for large files.
+        """
+        service = self._build_service(self._credentials_path)
+        return _execute_with_retry(service.files().get_media(fileId=file_id))
+
+    @staticmethod
+    def _download(
+        service,
+        file_id: str,
+        dest_dir: Optional[str] = None,
+        filename: Optional[str] = None,
+    ) -> str:
+        """Download one file using the given Drive service."""
         from googleapiclient.http import MediaIoBaseDownload
 
         # Get file metadata if filename not provided
         if not filename:
-            meta = self.service.files().get(fileId=file_id, fields="name").execute()
+            meta = _execute_with_retry(service.files().get(fileId=file_id, fields="name"))
             filename = meta['name']
 
         if dest_dir is None:
@@ -144,14 +308,14 @@ class DriveConnector:
 
         local_path = os.path.join(dest_dir, filename)
 
-        request = self.service.files().get_media(fileId=file_id)
+        request = service.files().get_media(fileId=file_id)
         with open(local_path, 'wb') as f:
-            downloader = MediaIoBaseDownload(io.FileIO(f.fileno(), 'wb'), request)
+            downloader = MediaIoBaseDownload(f, request, chunksize=DOWNLOAD_CHUNK_SIZE)
             done = False
             while not done:
-                _, done = downloader.next_chunk()
+                _, done = downloader.next_chunk(num_retries=MAX_RETRIES)
 
-        logger.info(f"Drive: downloaded {filename} -> {local_path}")
+        logger.info("Drive: downloaded %s -> %s", filename, local_path)
         return local_path
 
     def rename(self, file_id: str, new_name: str) -> dict:
@@ -159,13 +323,13 @@ class DriveConnector:
         Rename a file in Drive.
         Returns updated file metadata.
         """
-        result = self.service.files().update(
+        result = _execute_with_retry(self.service.files().update(
             fileId=file_id,
             body={"name": new_name},
             fields="id, name",
-        ).execute()
+        ))
 
-        logger.info(f"Drive: renamed {file_id} -> {new_name}")
+        logger.info("Drive: renamed %s -> %s", file_id, new_name)
         return result
 
     def move_to_folder(self, file_id: str, target_folder_id: str) -> dict:
@@ -174,17 +338,119 @@ class DriveConnector:
         Useful for organizing processed invoices.
         """
         # Get current parents
-        file = self.service.files().get(
+        file = _execute_with_retry(self.service.files().get(
             fileId=file_id, fields='parents'
-        ).execute()
+        ))
         previous_parents = ",".join(file.get('parents', []))
 
-        result = self.service.files().update(
+        result = _execute_with_retry(self.service.files().update(
             fileId=file_id,
             addParents=target_folder_id,
             removeParents=previous_parents,
             fields='id, name, parents',
-        ).execute()
+        ))
 
-        logger.info(f"Drive: moved {file_id} to folder {target_folder_id}")
+        logger.info("Drive: moved %s to folder %s", file_id, target_folder_id)
         return result
+
+    def rename_many(self, new_names: dict[str, str]) -> dict[str, dict]:
+        """
+        Rename several files using batched metadata requests.
+        new_names maps file_id -> new name.
+        Returns {file_id: updated metadata} for the renames that succeeded.
+        """
+        files = self.service.files()
+        results = self._execute_batched([
+            (file_id, files.update(fileId=file_id, body={"name": new_name}, fields="id, name"))
+            for file_id, new_name in new_names.items()
+        ])
+        logger.info("Drive: renamed %d/%d file(s)", len(results), len(new_names))
+        return results
+
+    def move_many(
+        self,
+        file_ids: list[str],
+        target_folder_id: str,
+        new_names: Optional[dict[str, str]] = None,
+        known_parents: Optional[dict[str, list[str]]] = None,
+    ) -> dict[str, dict]:
+        """
+        Move several files to a Drive folder using batched metadata requests.
+        If new_names (file_id -> new name) is given, each file is renamed in
+        the same update request instead of a separate rename call.
+        known_parents (file_id -> parent IDs, e.g. from list_invoices) skips
+        the parents lookup for those files.
+        Returns {file_id: updated metadata} for the moves that succeeded.
+        """
+        file_ids = list(dict.fromkeys(file_ids))
+        new_names = new_names or {}
+        files = self.service.files()
+
+        # Current parents are needed for removeParents
+        parents = {
+            file_id: {'parents': known_parents[file_id]}
+            for file_id in file_ids
+            if known_parents and known_parents.get(file_id) is not None
+        }
+        parents.update(self._execute_batched([
+            (file_id, files.get(fileId=file_id, fields='parents'))
+            for file_id in file_ids if file_id not in parents
+        ]))
+
+        results = self._execute_batched([
+            (file_id, files.update(
+                fileId=file_id,
+                addParents=target_folder_id,
+                removeParents=",".join(parents[file_id].get('parents', [])),
+                fields='id, name, parents',
+                **({"body": {"name": new_names[file_id]}} if file_id in new_names else {}),
+            ))
+            for file_id in file_ids if file_id in parents
+        ])
+        logger.info("Drive: moved %d/%d file(s) to folder %s", len(results), len(file_ids), target_folder_id)
+        return results
+
+    def _execute_batched(self, requests: list[tuple]) -> dict[str, dict]:
+        """
+        Execute (request_id, HttpRequest) pairs in batches of BATCH_MAX_SIZE.
+        Sub-requests that fail with a transient status (RETRY_STATUSES) are
+        sent again in a new batch with exponential backoff, up to MAX_RETRIES
+        times. Returns {request_id: response} for successful requests; other
+        failures are logged and left out.
+        """
+        from googleapiclient.errors import HttpError
+
+        results = {}
+        pending = list(requests)
+        delay = 1.0
+        for attempt in range(MAX_RETRIES + 1):
+            by_id = dict(pending)
+            retry = []
+            wait = 0.0
+
+            def _callback(request_id, response, exception):
+                nonlocal wait
+                if exception is None:
+                    results[request_id] = response
+                elif (attempt < MAX_RETRIES and isinstance(exception, HttpError)
+                        and getattr(exception.resp, 'status', None) in RETRY_STATUSES):
+                    retry.append((request_id, by_id[request_id]))
+                    wait = max(wait, _retry_wait(exception.resp, delay))
+                else:
+                    logger.warning("Drive: batch request %s failed: %s", request_id, exception)
+
+            for start in range(0, len(pending), BATCH_MAX_SIZE):
+                batch = self.service.new_batch_http_request(callback=_callback)
+                for request_id, request in pending[start:start + BATCH_MAX_SIZE]:
+                    batch.add(request, request_id=request_id)
+                _execute_with_retry(batch)
+
+            if not retry:
+                break
+            logger.warning("Drive: %d batch request(s) failed transiently, retrying in %.1fs (%d/%d)",
+                           len(retry), wait, attempt + 1, MAX_RETRIES)
+            time.sleep(wait)
+            delay *= 2
+            pending = retry
+
+        return results
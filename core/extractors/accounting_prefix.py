@@ -6,6 +6,11 @@ Supports PUR AA-XXXX_ and Pyt Vch AAAA-XXXX_ formats.
 import re
 from typing import Optional
 
+# Pattern 1: PUR AA-XXXX_
+_PUR_RE = re.compile(r'^(PUR\s+\d{2}-\d{4}_)')
+# Pattern 2: Pyt Vch AAAA-XXXX_
+_PYT_VCH_RE = re.compile(r'^(Pyt\s+Vch\s+\d{4}-\d{4}_)')
+
 
 def extract_accounting_prefix(filename: str) -> Optional[str]:
     """
@@ -17,13 +22,11 @@ def extract_accounting_prefix(filename: str) -> Optional[str]:
 
     Returns None if filename has no accounting prefix.
     """
-    # Pattern 1: PUR AA-XXXX_
-    match = re.match(r'^(PUR\s+\d{2}-\d{4}_)', filename)
-    if match:
-        return match.group(1)
+    # Most filenames carry no prefix: one cheap check before any regex
+    if not filename.startswith(('PUR', 'Pyt')):
+        return None
 
-    # Pattern 2: Pyt Vch AAAA-XXXX_
-    match = re.match(r'^(Pyt\s+Vch\s+\d{4}-\d{4}_)', filename)
+    match = _PUR_RE.match(filename) or _PYT_VCH_RE.match(filename)
     if match:
         return match.group(1)
 
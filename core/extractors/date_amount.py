@@ -3,6 +3,7 @@ Date and Amount/Currency extraction using dateparser and price-parser.
 Replaces 80+ fragile regex patterns from V3 with battle-tested libraries.
 """
 
+import functools
 import logging
 import re
 from datetime import date, datetime
@@ -31,6 +32,7 @@ DATE_CONTEXTS = [
     r'Date\s*(?:de\s*)?(?:la\s*)?facture\s*:?\s*',
     r'Date\s*:?\s*',
 ]
+_DATE_CONTEXT_RES = [re.compile(c + r'(.+?)(?:\n|$)', re.IGNORECASE) for c in DATE_CONTEXTS]
 
 # Contexts to AVOID (would extract the wrong date)
 NEGATIVE_CONTEXTS = [
@@ -40,6 +42,14 @@ NEGATIVE_CONTEXTS = [
     r'Expiry\s*Date',
     r'Ship\s*Date',
 ]
+_NEGATIVE_CONTEXT_RES = [re.compile(c, re.IGNORECASE) for c in NEGATIVE_CONTEXTS]
+
+_MIN_REASONABLE_DATE = datetime(2015, 1, 1)
+
+_ISO_DATE_RE = re.compile(r'^(\d{4})[-/](\d{1,2})[-/](\d{1,2})\b')
+# Whole-string DD/MM/YYYY, DD-MM-YYYY, DD.MM.YYYY (same separator twice)
+_DMY_DATE_RE = re.compile(r'^(\d{1,2})([/.\-])(\d{1,2})\2(\d{4})$')
+_ORDINAL_RE = re.compile(r'(\d+)(?:st|nd|rd|th)\b')
 
 # dateparser settings for consistent DMY parsing
 DATEPARSER_SETTINGS = {
@@ -52,6 +62,20 @@ DATEPARSER_SETTINGS = {
 DATEPARSER_LANGUAGES = ['en', 'fr']
 
 
+@functools.lru_cache(maxsize=64)
+def _date_context_res(custom_contexts: tuple[str, ...] = ()) -> list[re.Pattern]:
+    """
+    Compiled date-context patterns, supplier-specific contexts first.
+    Kept as separate searches: CPython's re scans each literal-prefixed
+    label faster than a single alternation over all of them.
+    """
+    custom = [
+        re.compile(rf'{c}\s*:?\s*(.+?)(?:\n|$)', re.IGNORECASE)
+        for c in custom_contexts
+    ]
+    return custom + _DATE_CONTEXT_RES
+
+
 def extract_date(text: str, supplier_template: Optional[dict] = None) -> Optional[date]:
     """
     Extract invoice date from text.
@@ -59,21 +83,22 @@ def extract_date(text: str, supplier_template: Optional[dict] = None) -> Optiona
     Phase 2: dateparser.search on first 2000 chars
     """
     # Build context list (supplier-specific first if available)
-    contexts = list(DATE_CONTEXTS)
+    custom = ()
     if supplier_template and supplier_template.get("date_context"):
-        custom = [rf'{c}\s*:?\s*' for c in supplier_template["date_context"]]
-        contexts = custom + contexts
+        custom = tuple(supplier_template["date_context"])
+
+    # Upper bound computed once for all candidates of this document
+    max_date = _max_reasonable_date()
 
     # Phase 1: Search near date labels
-    for context_pattern in contexts:
-        pattern = context_pattern + r'(.+?)(?:\n|$)'
-        match = re.search(pattern, text, re.IGNORECASE)
+    for context_re in _date_context_res(custom):
+        match = context_re.search(text)
         if match:
             date_text = match.group(1).strip()[:50]
             # Clean ordinals before parsing
             date_text = _clean_ordinals(date_text)
             parsed = _parse_date_text(date_text)
-            if parsed and _is_reasonable_date(parsed):
+            if parsed and _is_reasonable_date(parsed, max_date):
                 return parsed.date()
 
     # Phase 2: Search for dates in first 2000 chars
@@ -89,13 +114,13 @@ def extract_date(text: str, supplier_template: Optional[dict] = None) -> Optiona
 
     if results:
         for label, dt in results:
-            if not _is_reasonable_date(dt):
+            if not _is_reasonable_date(dt, max_date):
                 continue
             # Check this date is NOT in a negative context
             idx = search_text.find(label)
             if idx >= 0:
                 preceding = search_text[max(0, idx - 40):idx]
-                if any(re.search(neg, preceding, re.IGNORECASE) for neg in NEGATIVE_CONTEXTS):
+                if any(neg.search(preceding) for neg in _NEGATIVE_CONTEXT_RES):
                     continue
             return dt.date()
 
@@ -105,10 +130,11 @@ def extract_date(text: str, supplier_template: Optional[dict] = None) -> Optiona
 def _parse_date_text(text: str) -> Optional[datetime]:
     """
     Parse a date string, handling ISO format (YYYY-MM-DD) which dateparser
-    fails on with DMY settings, and falling back to dateparser for everything else.
+    fails on with DMY settings and plain numeric DD/MM/YYYY directly,
+    falling back to dateparser for everything else.
     """
     # Try ISO format first (YYYY-MM-DD or YYYY/MM/DD)
-    iso_match = re.match(r'^(\d{4})[-/](\d{1,2})[-/](\d{1,2})\b', text.strip())
+    iso_match = _ISO_DATE_RE.match(text.strip())
     if iso_match:
         try:
             return datetime(
@@ -119,6 +145,18 @@ def _parse_date_text(text: str) -> Optional[datetime]:
         except ValueError:
             pass
 
+    # Fast path for plain numeric day-first dates; dateparser is slow
+    dmy_match = _DMY_DATE_RE.match(text.strip())
+    if dmy_match:
+        try:
+            return datetime(
+                int(dmy_match.group(4)),
+                int(dmy_match.group(3)),
+                int(dmy_match.group(1)),
+            )
+        except ValueError:
+            pass  # e.g. month > 12: let dateparser try other orders
+
     # Try dateparser with DMY settings
     parsed = dateparser.parse(
         text,
@@ -134,19 +172,32 @@ def _parse_date_text(text: str) -> Optional[datetime]:
 
 def _clean_ordinals(text: str) -> str:
     """Remove ordinal suffixes: 22nd -> 22, 1st -> 1, etc."""
-    return re.sub(r'(\d+)(?:st|nd|rd|th)\b', r'\1', text)
+    return _ORDINAL_RE.sub(r'\1', text)
 
 
-def _is_reasonable_date(dt: datetime) -> bool:
+def _max_reasonable_date() -> datetime:
+    """Latest realistic invoice date: end of the year after next."""
+    return datetime(datetime.now().year + 2, 12, 31)
+
+
+def _is_reasonable_date(dt: datetime, max_date: Optional[datetime] = None) -> bool:
     """Check that date is within a realistic range for invoices."""
-    now = datetime.now()
-    return datetime(2015, 1, 1) <= dt <= datetime(now.year + 2, 12, 31)
+    if max_date is None:
+        max_date = _max_reasonable_date()
+    return _MIN_REASONABLE_DATE <= dt <= max_date
 
 
 # ─────────────────────────────────────────────────────────
 # AMOUNT + CURRENCY EXTRACTION
 # ─────────────────────────────────────────────────────────
 
+# Totals sit in the header block or at the end of the last page: long texts
+# (multi-page OCR) are reduced to their head and tail before scanning.
+# Native PDF text is capped upstream too, but always keeps the last page
+# (see pdfplumber_extractor.MAX_TEXT_CHARS)
+AMOUNT_SCAN_HEAD = 4000
+AMOUNT_SCAN_TAIL = 2000
+
 # Priority contexts for total amount (most specific first)
 AMOUNT_CONTEXTS = [
     r'Total\s*Amount\s*Due',
@@ -163,6 +214,7 @@ AMOUNT_CONTEXTS = [
     r'Total',
     r'Subtotal',
 ]
+_AMOUNT_CONTEXT_RES = [re.compile(c + r'[\s:]*(.+?)(?:\n|$)', re.IGNORECASE) for c in AMOUNT_CONTEXTS]
 
 # Map currency symbols to ISO codes
 SYMBOL_TO_CODE = {
@@ -170,6 +222,47 @@ SYMBOL_TO_CODE = {
     '₹': 'INR', '﷼': 'SAR', 'US$': 'USD',
 }
 
+# Currency detection table. Order matters: check specific patterns first.
+# Each entry: (pattern, literal needles, code). A pattern can only match if
+# one of its needles occurs in the uppercased text, so the regex runs only
+# after a cheap substring check; a None pattern means the needle is enough.
+_CURRENCY_PATTERNS = [
+    (re.compile(p, re.IGNORECASE) if p else None, needles, code)
+    for p, needles, code in (
+        (r'\bAED\b|Dirham(?!.*[Mm]arocain)', ('AED', 'DIRHAM'), 'AED'),
+        (r'\bUSD\b|US\s*\$|Dollars?\b', ('USD', '$', 'DOLLAR'), 'USD'),
+        (r'\bEUR\b|Euro[s]?\b|€', ('EUR', '€'), 'EUR'),
+        (r'\bGBP\b|£|Pound\s*Sterling', ('GBP', '£', 'POUND'), 'GBP'),
+        (r'\bINR\b|₹|Rupee', ('INR', '₹', 'RUPEE'), 'INR'),
+        (r'\bMAD\b|Dirham\s*[Mm]arocain', ('MAD', 'DIRHAM'), 'MAD'),
+        (r'\bSAR\b|﷼|Saudi\s*Riyal', ('SAR', '﷼', 'SAUDI'), 'SAR'),
+        (r'\bCHF\b|Swiss\s*Franc', ('CHF', 'SWISS'), 'CHF'),
+        (None, ('$',), 'USD'),  # Generic $ last
+    )
+]
+
+# OCR artifacts in amounts: each alternative is a whitespace run to delete
+_OCR_AMOUNT_SPACES = re.compile(
+    r'(?<=\d)\s+(?=\.\d)'                   # "960 .34" -> "960.34"
+    r'|(?<=\d\.)\s+(?=\d)'                  # "960. 34" -> "960.34"
+    r'|(?<=\d)\s+(?=\d{3}(?:[.,\s]|$))'       # "1 499.70" -> "1499.70" (space as thousands separator)
+)
+
+_NON_NUMERIC_RE = re.compile(r'[^\d.,]')
+
+# Every amount phase needs a digit; texts without any skip them all
+_DIGIT_RE = re.compile(r'\d')
+
+# Currency-tagged amounts for the last-resort fallback
+_TAGGED_AMOUNT_RE = re.compile(
+    r'(?:[\$€£₹]|AED|USD|EUR|INR|US\$)\s*'
+    r'(\d{1,3}(?:[,.]?\d{3})*[.,]\d{2})'
+    r'|'
+    r'(\d{1,3}(?:[,.]?\d{3})*[.,]\d{2})'
+    r'\s*(?:[\$€£₹]|AED|USD|EUR|INR)',
+    re.IGNORECASE
+)
+
 
 def extract_amount_and_currency(
     text: str,
@@ -181,14 +274,26 @@ def extract_amount_and_currency(
     Phase 2: Contextual search near "Total" labels
     Phase 3: Fallback - largest currency-tagged amount
     """
+    # Amounts are searched in head + tail only; currency markers are still
+    # resolved against the full text
+    scan_text = text
+    if len(text) > AMOUNT_SCAN_HEAD + AMOUNT_SCAN_TAIL:
+        scan_text = text[:AMOUNT_SCAN_HEAD] + "\n" + text[-AMOUNT_SCAN_TAIL:]
+
+    if not _DIGIT_RE.search(scan_text):
+        return None, None
+
     # Phase 1: Supplier-specific patterns
     if supplier_template and supplier_template.get("amount_patterns"):
-        sorted_patterns = sorted(
-            supplier_template["amount_patterns"],
-            key=lambda p: p.get("priority", 99)
-        )
-        for pat in sorted_patterns:
-            match = re.search(pat["pattern"], text, re.IGNORECASE | re.DOTALL)
+        amount_res = supplier_template.get("_amount_res")
+        if amount_res is None:
+            sorted_patterns = sorted(
+                supplier_template["amount_patterns"],
+                key=lambda p: p.get("priority", 99)
+            )
+            amount_res = [re.compile(p["pattern"], re.IGNORECASE | re.DOTALL) for p in sorted_patterns]
+        for amount_re in amount_res:
+            match = amount_re.search(scan_text)
             if match:
                 raw = _clean_ocr_amount(match.group(1).strip())
                 amount = _parse_amount(raw)
@@ -197,40 +302,41 @@ def extract_amount_and_currency(
                     return amount, currency
 
     # Phase 2: Contextual search near total labels
-    for context in AMOUNT_CONTEXTS:
-        pattern = context + r'[\s:]*(.+?)(?:\n|$)'
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
+    for context_re in _AMOUNT_CONTEXT_RES:
+        for match in context_re.finditer(scan_text):
             raw_line = match.group(1).strip()[:80]
             raw_line = _clean_ocr_amount(raw_line)
-            price = Price.fromstring(raw_line)
+            price = _parse_price(raw_line)
             if price.amount and price.amount > 0:
                 currency = _resolve_currency(price, text)
                 return price.amount, currency
 
     # Phase 3: Fallback - find largest currency-tagged amount
-    return _fallback_largest_amount(text)
+    return _fallback_largest_amount(scan_text, text)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_price(raw: str) -> Price:
+    """
+    Price.fromstring with memoization: label lines such as "Total 100.00 USD"
+    recur across a batch. The returned Price is shared; treat it as read-only.
+    """
+    return Price.fromstring(raw)
 
 
 def _clean_ocr_amount(raw: str) -> str:
     """Fix common OCR artifacts in amounts."""
-    # "960 .34" -> "960.34"
-    raw = re.sub(r'(\d)\s+\.(\d)', r'\1.\2', raw)
-    # "960. 34" -> "960.34"
-    raw = re.sub(r'(\d)\.\s+(\d)', r'\1.\2', raw)
-    # "1 499.70" -> "1499.70" (space as thousands separator)
-    raw = re.sub(r'(\d)\s+(\d{3})(?=[.,\s]|$)', r'\1\2', raw)
-    return raw.strip()
+    return _OCR_AMOUNT_SPACES.sub('', raw).strip()
 
 
 def _parse_amount(raw: str) -> Optional[Decimal]:
     """Parse a raw amount string to Decimal using price-parser."""
-    price = Price.fromstring(raw)
+    price = _parse_price(raw)
     if price.amount is not None:
         return price.amount
     # Manual fallback for simple numbers
     try:
-        cleaned = re.sub(r'[^\d.,]', '', raw)
+        cleaned = _NON_NUMERIC_RE.sub('', raw)
         # Handle European format (comma as decimal)
         if ',' in cleaned and '.' not in cleaned:
             parts = cleaned.split(',')
@@ -261,45 +367,26 @@ def _resolve_currency(price: Price, text: str) -> str:
 
 def _detect_currency(text: str) -> str:
     """Detect currency from text context."""
-    # Order matters: check specific patterns first
-    patterns = [
-        (r'\bAED\b|Dirham(?!.*[Mm]arocain)', 'AED'),
-        (r'\bUSD\b|US\s*\$|Dollars?\b', 'USD'),
-        (r'\bEUR\b|Euro[s]?\b|€', 'EUR'),
-        (r'\bGBP\b|£|Pound\s*Sterling', 'GBP'),
-        (r'\bINR\b|₹|Rupee', 'INR'),
-        (r'\bMAD\b|Dirham\s*[Mm]arocain', 'MAD'),
-        (r'\bSAR\b|﷼|Saudi\s*Riyal', 'SAR'),
-        (r'\bCHF\b|Swiss\s*Franc', 'CHF'),
-        (r'\$', 'USD'),  # Generic $ last
-    ]
-    for pattern, code in patterns:
-        if re.search(pattern, text, re.IGNORECASE):
+    text_upper = text.upper()
+    for pattern, needles, code in _CURRENCY_PATTERNS:
+        if any(n in text_upper for n in needles) and (pattern is None or pattern.search(text)):
             return code
     return 'XXX'
 
 
-def _fallback_largest_amount(text: str) -> Tuple[Optional[Decimal], Optional[str]]:
+def _fallback_largest_amount(
+    text: str, currency_text: str
+) -> Tuple[Optional[Decimal], Optional[str]]:
     """Last resort: find the largest currency-tagged amount in text."""
-    amount_re = re.compile(
-        r'(?:[\$€£₹]|AED|USD|EUR|INR|US\$)\s*'
-        r'(\d{1,3}(?:[,.]?\d{3})*[.,]\d{2})'
-        r'|'
-        r'(\d{1,3}(?:[,.]?\d{3})*[.,]\d{2})'
-        r'\s*(?:[\$€£₹]|AED|USD|EUR|INR)',
-        re.IGNORECASE
-    )
-    amounts = []
-    for match in amount_re.finditer(text):
-        raw = match.group(0)
-        raw = _clean_ocr_amount(raw)
-        price = Price.fromstring(raw)
-        if price.amount and price.amount > 0:
-            currency = _resolve_currency(price, text)
-            amounts.append((price.amount, currency))
-
-    if amounts:
-        amounts.sort(key=lambda x: x[0], reverse=True)
-        return amounts[0]
+    best = None
+    for match in _TAGGED_AMOUNT_RE.finditer(text):
+        raw = _clean_ocr_amount(match.group(0))
+        price = _parse_price(raw)
+        # Strictly greater: the first of equal amounts wins
+        if price.amount and price.amount > 0 and (best is None or price.amount > best.amount):
+            best = price
+
+    if best is not None:
+        return best.amount, _resolve_currency(best, currency_text)
 
     return None, None
@@ -9,6 +9,10 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Invoice numbers sit in the header block (occasionally repeated in the
+# footer): long texts are reduced to their head and tail before scanning
+INVOICE_NUMBER_SCAN_HEAD = 4000
+INVOICE_NUMBER_SCAN_TAIL = 2000
 
 # Generic invoice number patterns, ordered by specificity (most specific first)
 GENERIC_PATTERNS = [
@@ -39,6 +43,17 @@ GENERIC_PATTERNS = [
     # Customer invoice
     r'Customer\s*Invoices?\s*([A-Za-z0-9/]+)',
 ]
+# Compiled once, searched one by one: CPython's re scans a single
+# literal-prefixed pattern much faster than one alternation of all of them
+_GENERIC_RES = [re.compile(p, re.IGNORECASE) for p in GENERIC_PATTERNS]
+
+_NON_DIGITS = re.compile(r'[^0-9]')
+
+# Common false positives rejected by _is_valid_invoice_number
+_FALSE_POSITIVE_RES = [
+    re.compile(r'^\+\d{10,}$'),       # Phone number with + prefix
+    re.compile(r'^00\d{3}$'),         # Country code-like
+]
 
 
 def extract_invoice_number(text: str, supplier_template: Optional[dict] = None) -> Optional[str]:
@@ -47,18 +62,23 @@ def extract_invoice_number(text: str, supplier_template: Optional[dict] = None)
     Uses supplier-specific pattern first if available, then generic patterns.
     Returns the invoice number with # prefix, or None.
     """
+    if len(text) > INVOICE_NUMBER_SCAN_HEAD + INVOICE_NUMBER_SCAN_TAIL:
+        text = text[:INVOICE_NUMBER_SCAN_HEAD] + "\n" + text[-INVOICE_NUMBER_SCAN_TAIL:]
+
     # Phase 1: Try supplier-specific pattern (lighter validation — context already confirms)
     if supplier_template and supplier_template.get("invoice_number_pattern"):
-        pattern = supplier_template["invoice_number_pattern"]
-        match = re.search(pattern, text, re.IGNORECASE)
+        pattern = supplier_template.get("_invoice_number_re")
+        if pattern is None:
+            pattern = re.compile(supplier_template["invoice_number_pattern"], re.IGNORECASE)
+        match = pattern.search(text)
         if match:
             num = match.group(1).strip()
             if _is_valid_template_match(num):
                 return f"#{num}"
 
     # Phase 2: Generic patterns in order of specificity
-    for pattern in GENERIC_PATTERNS:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _GENERIC_RES:
+        match = pattern.search(text)
         if match:
             num = match.group(1).strip()
             if _is_valid_invoice_number(num):
@@ -91,17 +111,13 @@ def _is_valid_invoice_number(num: str) -> bool:
         return False
 
     # Reject strings that are too long in pure digits (>15 digits)
-    digits_only = re.sub(r'[^0-9]', '', num)
+    digits_only = _NON_DIGITS.sub('', num)
     if len(digits_only) > 15:
         return False
 
     # Reject common false positives
-    false_positive_patterns = [
-        r'^\+\d{10,}$',       # Phone number with + prefix
-        r'^00\d{3}$',         # Country code-like
-    ]
-    for fp in false_positive_patterns:
-        if re.match(fp, num):
+    for fp in _FALSE_POSITIVE_RES:
+        if fp.match(num):
             return False
 
     return True
@@ -3,18 +3,108 @@ Supplier name extraction using JSON templates + heuristic fallback.
 No hardcoded supplier patterns in code.
 """
 
+import functools
 import json
 import logging
 import os
 import re
+import threading
 from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except Exception:
+    AHOCORASICK_AVAILABLE = False
+    logger.warning("pyahocorasick not available - falling back to linear supplier template scan")
+
+# The heuristic only looks at the first lines; no need to split the whole text
+HEURISTIC_SCAN_HEAD = 4000
+
+_COMPANY_SUFFIXES = re.compile(
+    r'\b(Inc\.?|LLC|Ltd\.?|Limited|Corp\.?|Corporation|Company|Co\.?|Group|'
+    r'PJSC|GmbH|S\.?A\.?R\.?L\.?|Pvt\.?|PLC|SAS|SARL|SA|Srl|B\.?V\.?)\b',
+    re.IGNORECASE
+)
+
+_SKIP_WORDS = re.compile(
+    r'^\s*(Invoice|Receipt|Bill\b|Statement|Tax\s|Date|Total|'
+    r'Amount|Page\s|Tel\b|Phone|Email|Address|Street|'
+    r'P\.?O\.?\s*Box|www\.|http|Subtotal|Due\s|Payment|'
+    r'Description|Quantity|Unit|Price|Item|Service|'
+    r'IBAN|SWIFT|Account|Bank|Reference)',
+    re.IGNORECASE
+)
+
+# Characters that are neither letters nor spaces
+_NON_ALPHA = re.compile(r'[^\w ]|[\d_]')
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Serializes changes to the supplier templates: in-memory registration
+# here and the suppliers.json read-modify-write in supplier_learner
+TEMPLATES_LOCK = threading.Lock()
+
 # Resolve config path relative to this file
 _CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'config')
 
 
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(path: str, mtime_ns: int, size: int) -> Tuple[list, tuple]:
+    """Parse suppliers.json once per (path, mtime, size). Result is shared: do not mutate."""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    templates = config.get("suppliers", [])
+    for template in templates:
+        _compile_template(template)
+    own_companies = tuple(c.upper() for c in config.get("own_companies", []))
+    return templates, own_companies
+
+
+def _compile_template(template: dict) -> None:
+    """
+    Attach precompiled regexes to a loaded template, under '_'-prefixed keys:
+    - _invoice_number_re: invoice_number_pattern
+    - _amount_res: amount_patterns, already sorted by priority
+    Extractors compile on the fly for templates without these keys.
+    """
+    try:
+        if template.get("invoice_number_pattern"):
+            template["_invoice_number_re"] = re.compile(
+                template["invoice_number_pattern"], re.IGNORECASE
+            )
+        if template.get("amount_patterns"):
+            template["_amount_res"] = [
+                re.compile(p["pattern"], re.IGNORECASE | re.DOTALL)
+                for p in sorted(template["amount_patterns"], key=lambda p: p.get("priority", 99))
+            ]
+    except re.error as e:
+        logger.warning("Invalid pattern in supplier template '%s': %s", template.get('id'), e)
+
+
+def _load_config(config_path: str) -> Tuple[list, tuple]:
+    """Return (templates, own_companies), re-reading only when the file changed."""
+    path = os.path.abspath(config_path)
+    st = os.stat(path)
+    return _load_config_cached(path, st.st_mtime_ns, st.st_size)
+
+
+def _template_patterns(templates: list[dict], start: int = 0) -> list[tuple[str, int]]:
+    """
+    (uppercased pattern, template index) pairs in config order. Empty patterns
+    are dropped here, so both matching paths agree (an empty string would
+    match any text in the linear scan but can't be added to the automaton).
+    """
+    return [
+        (pattern.upper(), idx)
+        for idx, template in enumerate(templates, start)
+        for pattern in template.get("detection_patterns", [])
+        if pattern
+    ]
+
+
 class SupplierExtractor:
     """
     Two-phase supplier extraction:
@@ -25,10 +115,55 @@ class SupplierExtractor:
     def __init__(self, config_path: Optional[str] = None):
         if config_path is None:
             config_path = os.path.join(_CONFIG_DIR, 'suppliers.json')
-        with open(config_path, encoding='utf-8') as f:
-            config = json.load(f)
-        self.templates = config.get("suppliers", [])
-        self.own_companies = [c.upper() for c in config.get("own_companies", [])]
+        templates, own_companies = _load_config(config_path)
+        self.templates = list(templates)
+        self.own_companies = own_companies
+        # One alternation instead of a substring test per own company
+        self._own_re = (
+            re.compile("|".join(map(re.escape, own_companies))) if own_companies else None
+        )
+        # (uppercased pattern, template index) in config order, shared by the
+        # automaton and the linear fallback
+        self._patterns = _template_patterns(self.templates)
+        self._automaton = self._build_automaton(self._patterns)
+
+    def register_template(self, template: dict) -> bool:
+        """
+        Add a newly learned template without re-reading suppliers.json.
+        Returns False if a template with the same id is already loaded.
+        Attributes are rebuilt and swapped rather than mutated, so concurrent
+        extract() calls see either the old or the new set of templates;
+        concurrent registrations are serialized so none is lost.
+        """
+        template = dict(template)
+        _compile_template(template)
+        with TEMPLATES_LOCK:
+            if any(t.get("id") == template.get("id") for t in self.templates):
+                return False
+
+            patterns = self._patterns + _template_patterns([template], start=len(self.templates))
+            self.templates = self.templates + [template]
+            self._patterns = patterns
+            self._automaton = self._build_automaton(patterns)
+        return True
+
+    @staticmethod
+    def _build_automaton(patterns: list[tuple[str, int]]):
+        """
+        Build an Aho-Corasick automaton over (uppercased pattern, template index)
+        pairs, each pattern mapped to the first template that declares it.
+        Returns None when pyahocorasick is not installed.
+        """
+        if not AHOCORASICK_AVAILABLE:
+            return None
+        automaton = ahocorasick.Automaton()
+        for key, idx in patterns:
+            if key not in automaton:
+                automaton.add_word(key, idx)
+        if len(automaton) == 0:
+            return None
+        automaton.make_automaton()
+        return automaton
 
     def extract(self, text: str) -> Tuple[str, Optional[dict]]:
         """
@@ -45,10 +180,20 @@ class SupplierExtractor:
     def _match_template(self, text: str) -> Optional[dict]:
         """Match text against detection patterns from all templates."""
         text_upper = text.upper()
-        for template in self.templates:
-            for pattern in template.get("detection_patterns", []):
-                if pattern.upper() in text_upper:
-                    return template
+
+        if self._automaton is not None:
+            # Single pass over the text; earliest template in config order wins
+            best = None
+            for _, idx in self._automaton.iter(text_upper):
+                if best is None or idx < best:
+                    best = idx
+                    if best == 0:
+                        break
+            return self.templates[best] if best is not None else None
+
+        for pattern, idx in self._patterns:
+            if pattern in text_upper:
+                return self.templates[idx]
         return None
 
     def _heuristic_extract(self, text: str) -> str:
@@ -57,22 +202,7 @@ class SupplierExtractor:
         Looks at first 20 lines for company-like names.
         Excludes own company names (Bill To sections).
         """
-        lines = [l.strip() for l in text.split('\n') if l.strip()]
-
-        company_suffixes = re.compile(
-            r'\b(Inc\.?|LLC|Ltd\.?|Limited|Corp\.?|Corporation|Company|Co\.?|Group|'
-            r'PJSC|GmbH|S\.?A\.?R\.?L\.?|Pvt\.?|PLC|SAS|SARL|SA|Srl|B\.?V\.?)\b',
-            re.IGNORECASE
-        )
-
-        skip_words = re.compile(
-            r'^\s*(Invoice|Receipt|Bill\b|Statement|Tax\s|Date|Total|'
-            r'Amount|Page\s|Tel\b|Phone|Email|Address|Street|'
-            r'P\.?O\.?\s*Box|www\.|http|Subtotal|Due\s|Payment|'
-            r'Description|Quantity|Unit|Price|Item|Service|'
-            r'IBAN|SWIFT|Account|Bank|Reference)',
-            re.IGNORECASE
-        )
+        lines = [l.strip() for l in text[:HEURISTIC_SCAN_HEAD].split('\n') if l.strip()]
 
         candidates = []
         for i, line in enumerate(lines[:20]):
@@ -81,21 +211,21 @@ class SupplierExtractor:
                 continue
 
             # Skip known non-supplier lines
-            if skip_words.search(line):
+            if _SKIP_WORDS.search(line):
                 continue
 
             # Skip own company names (Bill To section)
-            if any(own in line.upper() for own in self.own_companies):
+            if self._own_re and self._own_re.search(line.upper()):
                 continue
 
             # Skip lines that are mostly numbers/symbols
-            alpha_count = sum(c.isalpha() or c == ' ' for c in line)
+            alpha_count = len(line) - len(_NON_ALPHA.findall(line))
             if alpha_count < len(line) * 0.5:
                 continue
 
             # Score candidates
             score = 0
-            if company_suffixes.search(line):
+            if _COMPANY_SUFFIXES.search(line):
                 score += 15
             if i < 5:
                 score += (5 - i)
@@ -107,9 +237,9 @@ class SupplierExtractor:
             candidates.append((score, line))
 
         if candidates:
-            candidates.sort(key=lambda x: x[0], reverse=True)
-            best = candidates[0][1]
+            # First line with the highest score
+            best = max(candidates, key=lambda x: x[0])[1]
             # Clean for filename: replace spaces with underscores
-            return re.sub(r'\s+', '_', best.strip())
+            return _WHITESPACE.sub('_', best.strip())
 
         return "Unknown"
@@ -9,12 +9,51 @@ import json
 import logging
 import os
 import re
-from typing import Optional
+import stat
+import tempfile
+from itertools import islice
+from typing import Callable, Iterator, Optional
+
+from .supplier import TEMPLATES_LOCK
 
 logger = logging.getLogger(__name__)
 
 _CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'config')
 
+_COMPANY_SUFFIXES = re.compile(
+    r'\b(Inc\.?|LLC|Ltd\.?|Limited|Corp\.?|Corporation|Company|Co\.?|Group|'
+    r'PJSC|GmbH|S\.?A\.?R\.?L\.?|Pvt\.?|PLC|SAS|SARL|SA|Srl|B\.?V\.?)\b',
+    re.IGNORECASE
+)
+
+_SKIP_WORDS = re.compile(
+    r'^\s*(Invoice|Receipt|Bill\b|Statement|Tax\s|Date|Total|'
+    r'Amount|Page\s|Tel\b|Phone|Email|Address|Street|'
+    r'P\.?O\.?\s*Box|www\.|http|Subtotal|Due\s|Payment)',
+    re.IGNORECASE
+)
+
+_WWW_RE = re.compile(r'www\.\S+', re.IGNORECASE)
+_ID_CLEAN = re.compile(r'[^a-z0-9]+')
+_WS_RE = re.compile(r'\s+')
+
+
+def non_empty_lines(text: str) -> Iterator[str]:
+    """
+    Lazily yield stripped, non-empty lines of text. Each line is sliced
+    out on demand, so callers that stop early never copy the rest.
+    """
+    start = 0
+    size = len(text)
+    while start < size:
+        end = text.find('\n', start)
+        if end < 0:
+            end = size
+        line = text[start:end].strip()
+        if line:
+            yield line
+        start = end + 1
+
 
 def build_detection_patterns(text: str, supplier_name: str) -> list[str]:
     """
@@ -22,34 +61,20 @@ def build_detection_patterns(text: str, supplier_name: str) -> list[str]:
     Looks for company-like lines near the top of the document.
     """
     patterns = []
-    lines = [l.strip() for l in text.split('\n') if l.strip()]
-
-    company_suffixes = re.compile(
-        r'\b(Inc\.?|LLC|Ltd\.?|Limited|Corp\.?|Corporation|Company|Co\.?|Group|'
-        r'PJSC|GmbH|S\.?A\.?R\.?L\.?|Pvt\.?|PLC|SAS|SARL|SA|Srl|B\.?V\.?)\b',
-        re.IGNORECASE
-    )
+    name_lower = supplier_name.lower().replace('_', ' ')
 
-    skip_words = re.compile(
-        r'^\s*(Invoice|Receipt|Bill\b|Statement|Tax\s|Date|Total|'
-        r'Amount|Page\s|Tel\b|Phone|Email|Address|Street|'
-        r'P\.?O\.?\s*Box|www\.|http|Subtotal|Due\s|Payment)',
-        re.IGNORECASE
-    )
-
-    for line in lines[:15]:
+    for line in islice(non_empty_lines(text), 15):
         if len(line) < 3 or len(line) > 80:
             continue
-        if skip_words.search(line):
+        if _SKIP_WORDS.search(line):
             # Keep www. lines as they're good detection patterns
-            if 'www.' in line.lower():
-                url_match = re.search(r'www\.\S+', line, re.IGNORECASE)
-                if url_match:
-                    patterns.append(url_match.group())
+            url_match = _WWW_RE.search(line)
+            if url_match:
+                patterns.append(url_match.group())
             continue
-        if company_suffixes.search(line):
+        if _COMPANY_SUFFIXES.search(line):
             patterns.append(line)
-        elif supplier_name.lower().replace('_', ' ') in line.lower():
+        elif name_lower in line.lower():
             patterns.append(line)
 
     # Deduplicate while preserving order
@@ -72,10 +97,13 @@ def create_supplier_template(
     """
     Build a new supplier template dict ready for suppliers.json.
     """
-    template_id = re.sub(r'[^a-z0-9]+', '_', supplier_name.lower()).strip('_')
-    display_name = re.sub(r'\s+', '_', supplier_name.strip())
+    template_id = _ID_CLEAN.sub('_', supplier_name.lower()).strip('_')
+    display_name = _WS_RE.sub('_', supplier_name.strip())
 
-    if not detection_patterns:
+    if detection_patterns:
+        # Copy so the insert below never touches the caller's list
+        detection_patterns = list(detection_patterns)
+    else:
         detection_patterns = build_detection_patterns(text, supplier_name)
     # Always include the supplier name as a pattern if not already present
     if not any(supplier_name.lower() in p.lower() for p in detection_patterns):
@@ -101,37 +129,60 @@ def save_supplier_template(template: dict, config_path: Optional[str] = None) ->
         config_path = os.path.join(_CONFIG_DIR, 'suppliers.json')
 
     try:
-        with open(config_path, encoding='utf-8') as f:
-            config = json.load(f)
-
-        # Check if supplier already exists
-        existing_ids = {s['id'] for s in config.get('suppliers', [])}
-        if template['id'] in existing_ids:
-            logger.info(f"Supplier '{template['id']}' already exists, skipping.")
-            return False
-
-        config['suppliers'].append(template)
+        with TEMPLATES_LOCK:
+            return _save_locked(template, config_path)
+    except Exception as e:
+        logger.error("Failed to save supplier template: %s", e)
+        return False
 
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
-            f.write('\n')
 
-        logger.info(f"Saved new supplier template: {template['display_name']}")
-        return True
+def _save_locked(template: dict, config_path: str) -> bool:
+    """Read-modify-write of suppliers.json; caller holds TEMPLATES_LOCK."""
+    with open(config_path, encoding='utf-8') as f:
+        config = json.load(f)
 
-    except Exception as e:
-        logger.error(f"Failed to save supplier template: {e}")
+    # Check if supplier already exists
+    existing_ids = {s['id'] for s in config.get('suppliers', [])}
+    if template['id'] in existing_ids:
+        logger.info("Supplier '%s' already exists, skipping.", template['id'])
         return False
 
+    config['suppliers'].append(template)
 
-def prompt_supplier_info(text: str) -> Optional[dict]:
+    # Serialize once and write a single buffer to a private temp file, then
+    # swap it in atomically so readers never see a half-written config
+    payload = (json.dumps(config, indent=2, ensure_ascii=False) + '\n').encode('utf-8')
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(config_path)), suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        # mkstemp creates 0600 files; keep the config's own permissions
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(config_path).st_mode))
+        os.replace(tmp_path, config_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    logger.info("Saved new supplier template: %s", template['display_name'])
+    return True
+
+
+def prompt_supplier_info(
+    text: str,
+    on_saved: Optional[Callable[[dict], object]] = None,
+) -> Optional[dict]:
     """
     Interactive CLI prompt to collect supplier info from the user.
     Shows the first 10 lines of the invoice for context.
     Returns a supplier template dict, or None if user skips.
+    on_saved is called with the template only once it was written to config.
     """
-    lines = [l.strip() for l in text.split('\n') if l.strip()]
-    preview = '\n'.join(f"  {l}" for l in lines[:10])
+    preview = '\n'.join(f"  {l}" for l in islice(non_empty_lines(text), 10))
 
     print("\n--- Supplier not recognized ---")
     print("Invoice preview (first 10 lines):")
@@ -167,6 +218,8 @@ def prompt_supplier_info(text: str) -> Optional[dict]:
         saved = save_supplier_template(template)
         if saved:
             print(f"  Supplier '{supplier_name}' saved to config.")
+            if on_saved is not None:
+                on_saved(template)
         else:
             print(f"  Supplier '{supplier_name}' already exists in config.")
 
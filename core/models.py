@@ -5,11 +5,19 @@ Pydantic models for invoice data extraction and validation.
 from datetime import date as date_type
 from decimal import Decimal
 from typing import Optional
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator
+
+VALID_CURRENCIES = frozenset({
+    'USD', 'EUR', 'AED', 'GBP', 'INR', 'SAR', 'MAD', 'CHF',
+    'CAD', 'AUD', 'JPY', 'SGD', 'QAR', 'KWD', 'BHD', 'OMR',
+    'EGP', 'PKR', 'XXX',
+})
 
 
 class InvoiceData(BaseModel):
     """Validated invoice data extracted from a document."""
+    model_config = ConfigDict(frozen=True)
+
     supplier: str = "Unknown"
     invoice_number: Optional[str] = None
     invoice_date: Optional[date_type] = None
@@ -30,12 +38,7 @@ class InvoiceData(BaseModel):
     @field_validator('currency')
     @classmethod
     def currency_must_be_valid(cls, v):
-        valid = {
-            'USD', 'EUR', 'AED', 'GBP', 'INR', 'SAR', 'MAD', 'CHF',
-            'CAD', 'AUD', 'JPY', 'SGD', 'QAR', 'KWD', 'BHD', 'OMR',
-            'EGP', 'PKR', 'XXX',
-        }
-        if v is not None and v not in valid:
+        if v is not None and v not in VALID_CURRENCIES:
             raise ValueError(f'Unknown currency: {v}')
         return v
 
@@ -54,6 +57,8 @@ class InvoiceData(BaseModel):
 
 class SupplierTemplate(BaseModel):
     """A supplier detection and extraction template."""
+    model_config = ConfigDict(frozen=True)
+
     id: str
     display_name: str
     detection_patterns: list[str]
@@ -66,6 +71,8 @@ class SupplierTemplate(BaseModel):
 
 class CompanyConfig(BaseModel):
     """Company configuration with VAT calendar."""
+    model_config = ConfigDict(frozen=True)
+
     id: str
     name: str
     vat_calendar: Optional[dict] = None
@@ -3,6 +3,7 @@ Filename generation engine.
 Produces clean, filesystem-safe filenames from extracted invoice data.
 """
 
+import functools
 import os
 import re
 import unicodedata
@@ -10,6 +11,10 @@ from typing import Optional
 
 from .models import InvoiceData
 
+_FN_INVALID = re.compile(r'[/\\:*?"<>|,.&;\'()@!%^~`{}[\]+=$]')
+_FN_WS = re.compile(r'\s+')
+_FN_DUP_US = re.compile(r'_+')
+
 
 def generate_filename(
     data: InvoiceData,
@@ -55,29 +60,55 @@ def _clean_for_filename(s: str, default: str) -> str:
     if not s or not s.strip():
         s = default
 
-    # Normalize unicode (remove accents)
-    s = unicodedata.normalize('NFKD', str(s)).encode('ascii', 'ignore').decode('ascii')
+    s = str(s)
+    # Plain alphanumeric ASCII (e.g. "AWS") is already filename-safe
+    if s.isascii() and s.isalnum():
+        return s
+
+    return _clean_cached(s) or default
+
+
+@functools.lru_cache(maxsize=4096)
+def _clean_cached(s: str) -> str:
+    """Cleaning work for _clean_for_filename; suppliers repeat across a batch."""
+    # Normalize unicode (remove accents); plain ASCII needs no folding
+    if not s.isascii():
+        s = unicodedata.normalize('NFKD', s).encode('ascii', 'ignore').decode('ascii')
 
     # Remove invalid filename characters and special symbols
-    s = re.sub(r'[/\\:*?"<>|,.&;\'()@!%^~`{}[\]+=$]', '_', s)
+    s = _FN_INVALID.sub('_', s)
 
     # Replace spaces with underscores
-    s = re.sub(r'\s+', '_', s.strip())
+    s = _FN_WS.sub('_', s.strip())
 
     # Clean up multiple underscores
-    s = re.sub(r'_+', '_', s)
-    s = s.strip('_')
-
-    return s if s else default
+    s = _FN_DUP_US.sub('_', s)
+    return s.strip('_')
 
 
 def _ensure_unique(filename: str, dirpath: str, parts: list, ext: str) -> str:
     """Append counter to filename if it already exists in the directory."""
-    candidate = os.path.join(dirpath, filename)
+    try:
+        st = os.stat(dirpath)
+        existing = _list_dir_cached(dirpath, st.st_mtime_ns)
+    except OSError:
+        existing = frozenset()
+
+    candidate = filename
     counter = 1
-    while os.path.exists(candidate):
-        new_parts = parts + [str(counter)]
-        filename = "_".join(new_parts) + ext
-        candidate = os.path.join(dirpath, filename)
+    while candidate in existing:
+        candidate = "_".join(parts + [str(counter)]) + ext
+        counter += 1
+
+    # Confirm with one stat in case the cached listing is stale
+    # (coarse mtime resolution); fall back to probing the filesystem.
+    while os.path.exists(os.path.join(dirpath, candidate)):
+        candidate = "_".join(parts + [str(counter)]) + ext
         counter += 1
-    return filename
+    return candidate
+
+
+@functools.lru_cache(maxsize=8)
+def _list_dir_cached(dirpath: str, mtime_ns: int) -> frozenset:
+    """Directory listing as a set; keyed on mtime so renames invalidate it."""
+    return frozenset(os.listdir(dirpath))
@@ -3,9 +3,13 @@ Main extraction pipeline orchestrator.
 Coordinates text extraction, data extraction, classification, and naming.
 """
 
+import itertools
 import logging
 import os
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal
+from typing import Callable, Optional
 
 from .models import InvoiceData, ExtractionResult
 from .text.smart_extractor import SmartTextExtractor
@@ -18,6 +22,9 @@ from .naming import generate_filename
 
 logger = logging.getLogger(__name__)
 
+# Pipeline owned by a process_batch worker process, built by its initializer
+_worker_pipeline: Optional["InvoicePipeline"] = None
+
 
 class InvoicePipeline:
     """
@@ -34,24 +41,32 @@ class InvoicePipeline:
         vision_client=None,
         suppliers_config: Optional[str] = None,
         companies_config: Optional[str] = None,
+        vision_client_factory: Optional[Callable] = None,
     ):
-        self.text_extractor = SmartTextExtractor(vision_client=vision_client)
+        self.text_extractor = SmartTextExtractor(
+            vision_client=vision_client, vision_client_factory=vision_client_factory,
+        )
         self.supplier_extractor = SupplierExtractor(config_path=suppliers_config)
         self.vat_classifier = VATQuarterClassifier(config_path=companies_config)
+        self._suppliers_config = suppliers_config
+        self._companies_config = companies_config
 
     def process_file(
         self,
         filepath: str,
         include_vat_quarter: bool = True,
         debug: bool = False,
+        unique_name: bool = True,
     ) -> ExtractionResult:
         """
         Process a single file end-to-end.
         Returns ExtractionResult with all extracted data and suggested filename.
+        unique_name makes the new filename unique within the file's directory;
+        pass False for temporary copies (uploads, Drive downloads), where the
+        only file there is the copy itself.
         """
         filename = os.path.basename(filepath)
-        dirpath = os.path.dirname(filepath)
-        errors = []
+        dirpath = os.path.dirname(filepath) if unique_name else None
 
         # Step 0: Validate file
         is_valid, error_msg = self.text_extractor.validate_file(filepath)
@@ -79,19 +94,75 @@ class InvoicePipeline:
                 errors=["No text could be extracted from file"],
             )
 
-        if debug:
-            logger.info(f"DEBUG - File: {filename}")
-            logger.info(f"DEBUG - Method: {method}")
-            logger.info(f"DEBUG - Text length: {len(text)}")
-            logger.info(f"DEBUG - First 300 chars:\n{text[:300]}")
+        return self._analyze_text(
+            text, method, filename,
+            include_vat_quarter=include_vat_quarter, dirpath=dirpath, debug=debug,
+        )
+
+    def process_bytes(
+        self,
+        data: bytes,
+        filename: str,
+        include_vat_quarter: bool = True,
+    ) -> ExtractionResult:
+        """
+        Process an in-memory file (e.g. downloaded straight from Drive)
+        without writing it to disk. filename supplies the extension and
+        the original name.
+        """
+        is_valid, error_msg = self.text_extractor.validate_bytes(data, filename)
+        if not is_valid:
+            return ExtractionResult(
+                invoice_data=InvoiceData(),
+                original_filename=filename,
+                errors=[error_msg or "File validation failed"],
+            )
+
+        try:
+            text, method = self.text_extractor.extract_from_bytes(data, filename)
+        except Exception as e:
+            return ExtractionResult(
+                invoice_data=InvoiceData(),
+                original_filename=filename,
+                errors=[f"Text extraction failed: {e}"],
+            )
+
+        if not text or len(text.strip()) < 10:
+            return ExtractionResult(
+                invoice_data=InvoiceData(extraction_method=method),
+                original_filename=filename,
+                errors=["No text could be extracted from file"],
+            )
+
+        return self._analyze_text(
+            text, method, filename, include_vat_quarter=include_vat_quarter,
+        )
+
+    def _analyze_text(
+        self,
+        text: str,
+        method: str,
+        filename: str,
+        include_vat_quarter: bool = True,
+        dirpath: Optional[str] = None,
+        debug: bool = False,
+    ) -> ExtractionResult:
+        """Steps 2-6: supplier, fields, prefix, VAT quarter and filename from text."""
+        errors = []
+
+        if debug and logger.isEnabledFor(logging.INFO):
+            logger.info("DEBUG - File: %s", filename)
+            logger.info("DEBUG - Method: %s", method)
+            logger.info("DEBUG - Text length: %d", len(text))
+            logger.info("DEBUG - First 300 chars:\n%s", text[:300])
 
         # Step 2: Extract supplier
         supplier_name, supplier_template = self.supplier_extractor.extract(text)
 
         # Step 3: Extract fields using supplier template for context
-        invoice_number = extract_invoice_number(text, supplier_template)
-        invoice_date = extract_date(text, supplier_template)
-        amount, currency = extract_amount_and_currency(text, supplier_template)
+        invoice_number, invoice_date, amount, currency = self._extract_fields(
+            text, supplier_template
+        )
 
         # Build InvoiceData
         invoice_data = InvoiceData(
@@ -104,10 +175,10 @@ class InvoicePipeline:
         )
 
         # Calculate confidence
-        invoice_data.confidence = self._calculate_confidence(invoice_data)
+        invoice_data = self._with_confidence(invoice_data)
 
         if debug:
-            logger.info(f"DEBUG - Extracted: {invoice_data}")
+            logger.info("DEBUG - Extracted: %s", invoice_data)
 
         # Step 4: Accounting prefix
         accounting_prefix = extract_accounting_prefix(filename)
@@ -140,6 +211,40 @@ class InvoicePipeline:
             raw_text=raw_text,
         )
 
+    def process_batch(
+        self,
+        filepaths: list[str],
+        include_vat_quarter: bool = True,
+        max_workers: Optional[int] = None,
+    ) -> list[ExtractionResult]:
+        """
+        Process many files in parallel worker processes (text extraction and
+        parsing are CPU-bound and hold the GIL). Results keep input order.
+        Each worker builds its own pipeline once. Vision clients can't be
+        pickled, so workers get a factory instead and only build a client on
+        their first OCR call.
+        """
+        workers = max_workers or os.cpu_count() or 1
+        if workers <= 1 or len(filepaths) <= 1:
+            return [
+                self.process_file(path, include_vat_quarter=include_vat_quarter)
+                for path in filepaths
+            ]
+
+        vision_factory = _create_vision_client if self.text_extractor.has_vision else None
+        chunksize = max(1, len(filepaths) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(self._suppliers_config, self._companies_config, vision_factory),
+        ) as pool:
+            return list(pool.map(
+                _process_in_worker,
+                filepaths,
+                itertools.repeat(include_vat_quarter),
+                chunksize=chunksize,
+            ))
+
     def process_text(
         self,
         text: str,
@@ -149,44 +254,8 @@ class InvoicePipeline:
         """
         Process already-extracted text (useful for testing).
         """
-        supplier_name, supplier_template = self.supplier_extractor.extract(text)
-        invoice_number = extract_invoice_number(text, supplier_template)
-        invoice_date = extract_date(text, supplier_template)
-        amount, currency = extract_amount_and_currency(text, supplier_template)
-
-        invoice_data = InvoiceData(
-            supplier=supplier_name,
-            invoice_number=invoice_number,
-            invoice_date=invoice_date,
-            amount=amount,
-            currency=currency,
-            extraction_method="direct_text",
-        )
-        invoice_data.confidence = self._calculate_confidence(invoice_data)
-
-        accounting_prefix = extract_accounting_prefix(filename)
-
-        vat_quarter = None
-        if include_vat_quarter and invoice_date:
-            vat_quarter = self.vat_classifier.classify(invoice_date)
-
-        new_filename = generate_filename(
-            data=invoice_data,
-            original_filename=filename,
-            accounting_prefix=accounting_prefix,
-            vat_quarter=vat_quarter,
-        )
-
-        raw_text = text if supplier_name == "Unknown" or supplier_template is None else None
-
-        return ExtractionResult(
-            invoice_data=invoice_data,
-            supplier_template=supplier_template,
-            original_filename=filename,
-            new_filename=new_filename,
-            accounting_prefix=accounting_prefix,
-            vat_quarter=vat_quarter,
-            raw_text=raw_text,
+        return self._analyze_text(
+            text, "direct_text", filename, include_vat_quarter=include_vat_quarter,
         )
 
     def reprocess_with_supplier(
@@ -202,14 +271,15 @@ class InvoicePipeline:
         text = result.raw_text
         if not text:
             # No raw text available, just update the supplier name
-            result.invoice_data.supplier = supplier_name
-            result.invoice_data.confidence = self._calculate_confidence(result.invoice_data)
+            result.invoice_data = self._with_confidence(
+                result.invoice_data.model_copy(update={'supplier': supplier_name})
+            )
             return result
 
         # Re-extract fields with the new template context
-        invoice_number = extract_invoice_number(text, supplier_template)
-        invoice_date = extract_date(text, supplier_template)
-        amount, currency = extract_amount_and_currency(text, supplier_template)
+        invoice_number, invoice_date, amount, currency = self._extract_fields(
+            text, supplier_template
+        )
 
         # Use template's default currency if extraction found nothing
         if not currency and supplier_template and supplier_template.get('default_currency'):
@@ -223,7 +293,7 @@ class InvoicePipeline:
             currency=currency or result.invoice_data.currency,
             extraction_method=result.invoice_data.extraction_method,
         )
-        invoice_data.confidence = self._calculate_confidence(invoice_data)
+        invoice_data = self._with_confidence(invoice_data)
 
         from .naming import generate_filename
         new_filename = generate_filename(
@@ -243,6 +313,27 @@ class InvoicePipeline:
             errors=result.errors,
         )
 
+    @staticmethod
+    def _extract_fields(
+        text: str,
+        supplier_template: Optional[dict],
+    ) -> tuple[Optional[str], Optional[date], Optional[Decimal], Optional[str]]:
+        """
+        Extract (invoice_number, invoice_date, amount, currency) from text.
+        Only amount and currency are extracted together; each extractor runs
+        its own label searches, and the date and amount context lists each
+        scan the full text.
+        """
+        invoice_number = extract_invoice_number(text, supplier_template)
+        invoice_date = extract_date(text, supplier_template)
+        amount, currency = extract_amount_and_currency(text, supplier_template)
+        return invoice_number, invoice_date, amount, currency
+
+    @classmethod
+    def _with_confidence(cls, data: InvoiceData) -> InvoiceData:
+        """Return data with its confidence score filled in (models are frozen)."""
+        return data.model_copy(update={'confidence': cls._calculate_confidence(data)})
+
     @staticmethod
     def _calculate_confidence(data: InvoiceData) -> float:
         """Calculate confidence score based on how many fields were extracted."""
@@ -265,3 +356,32 @@ class InvoicePipeline:
         if data.currency and data.currency != "XXX":
             score += weights['currency']
         return round(score, 2)
+
+
+def _init_batch_worker(
+    suppliers_config: Optional[str],
+    companies_config: Optional[str],
+    vision_client_factory: Optional[Callable],
+) -> None:
+    """ProcessPoolExecutor initializer: build this worker's pipeline once."""
+    global _worker_pipeline
+    _worker_pipeline = InvoicePipeline(
+        vision_client_factory=vision_client_factory,
+        suppliers_config=suppliers_config,
+        companies_config=companies_config,
+    )
+
+
+def _create_vision_client():
+    """Vision client factory for batch workers; module-level so it pickles."""
+    try:
+        from google.cloud import vision
+        return vision.ImageAnnotatorClient()
+    except Exception as e:
+        logger.warning("Vision client unavailable in batch worker: %s", e)
+        return None
+
+
+def _process_in_worker(filepath: str, include_vat_quarter: bool) -> ExtractionResult:
+    """Run one file through the worker-local pipeline."""
+    return _worker_pipeline.process_file(filepath, include_vat_quarter=include_vat_quarter)
@@ -5,7 +5,8 @@ falls back to Google Cloud Vision OCR only for scanned PDFs and images.
 
 import logging
 import os
-from typing import Tuple, Optional
+import threading
+from typing import Callable, Tuple, Optional
 
 from .pdfplumber_extractor import extract_text_from_pdf_path, extract_text_from_pdf_bytes
 from .vision_ocr import ocr_pdf_path, ocr_pdf_bytes, ocr_image_path
@@ -16,6 +17,9 @@ logger = logging.getLogger(__name__)
 MIN_TEXT_LENGTH = 50
 
 SUPPORTED_FORMATS = ('.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.bmp')
+_IMAGE_FORMATS = frozenset(SUPPORTED_FORMATS) - {'.pdf'}
+
+_PDF_MAGIC = b'%PDF-'
 
 
 class SmartTextExtractor:
@@ -25,8 +29,32 @@ class SmartTextExtractor:
     - Google Vision OCR for scanned PDFs and images -> ~98% accuracy, ~$0.0015/page
     """
 
-    def __init__(self, vision_client=None):
-        self.vision_client = vision_client
+    def __init__(self, vision_client=None, vision_client_factory: Optional[Callable] = None):
+        self._vision_client = vision_client
+        # Only called the first time OCR is needed, so native-PDF runs never
+        # pay for the Vision import, gRPC channel and credential lookup
+        self._vision_client_factory = vision_client_factory if vision_client is None else None
+        self._vision_lock = threading.Lock()
+
+    @property
+    def vision_client(self):
+        """
+        Vision client, built by the factory on first access. A factory that
+        returns None (e.g. credentials temporarily unavailable) is kept and
+        tried again on the next access.
+        """
+        if self._vision_client_factory is not None:
+            with self._vision_lock:
+                if self._vision_client_factory is not None:
+                    self._vision_client = self._vision_client_factory()
+                    if self._vision_client is not None:
+                        self._vision_client_factory = None
+        return self._vision_client
+
+    @property
+    def has_vision(self) -> bool:
+        """Whether a Vision client is set or can be built (without building it)."""
+        return self._vision_client is not None or self._vision_client_factory is not None
 
     def extract_from_path(self, filepath: str) -> Tuple[str, str]:
         """
@@ -39,18 +67,21 @@ class SmartTextExtractor:
             # Try pdfplumber first (free, instant, perfect for native PDFs)
             text = extract_text_from_pdf_path(filepath)
             if text and len(text.strip()) >= MIN_TEXT_LENGTH:
-                logger.info(f"pdfplumber extracted {len(text)} chars from {os.path.basename(filepath)}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("pdfplumber extracted %d chars from %s",
+                                len(text), os.path.basename(filepath))
                 return text, "pdfplumber"
 
             # Fallback to Vision OCR (scanned PDF)
             if self.vision_client:
-                logger.info(f"Falling back to Vision OCR for {os.path.basename(filepath)}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Falling back to Vision OCR for %s", os.path.basename(filepath))
                 text = ocr_pdf_path(self.vision_client, filepath)
                 return text, "vision_ocr"
             else:
                 return text or "", "pdfplumber"
 
-        elif ext in ('.jpg', '.jpeg', '.png', '.tiff', '.bmp'):
+        elif ext in _IMAGE_FORMATS:
             # Images always need OCR
             if self.vision_client:
                 text = ocr_image_path(self.vision_client, filepath)
@@ -79,7 +110,7 @@ class SmartTextExtractor:
             else:
                 return text or "", "pdfplumber"
 
-        elif ext in ('.jpg', '.jpeg', '.png', '.tiff', '.bmp'):
+        elif ext in _IMAGE_FORMATS:
             if self.vision_client:
                 from PIL import Image
                 import io
@@ -100,18 +131,34 @@ class SmartTextExtractor:
     @staticmethod
     def validate_file(filepath: str) -> Tuple[bool, Optional[str]]:
         """Validate file before processing. Returns (is_valid, error_message)."""
-        if not os.path.exists(filepath):
+        # One stat covers existence and size; readability is checked by
+        # opening PDFs here and by the extractor for everything else
+        try:
+            st = os.stat(filepath)
+        except FileNotFoundError:
             return False, "File not found"
-        if not os.access(filepath, os.R_OK):
+        except PermissionError:
             return False, "File not readable (permission denied)"
-        if os.path.getsize(filepath) == 0:
+        except OSError:
+            return False, "File not found"
+        if st.st_size == 0:
             return False, "File is empty (0 bytes)"
         if filepath.lower().endswith('.pdf'):
             try:
                 with open(filepath, 'rb') as f:
-                    header = f.read(8)
-                    if not header.startswith(b'%PDF-'):
+                    if f.read(5) != _PDF_MAGIC:
                         return False, "Not a valid PDF file (missing PDF header)"
+            except PermissionError:
+                return False, "File not readable (permission denied)"
             except Exception:
                 return False, "Cannot read PDF file"
         return True, None
+
+    @staticmethod
+    def validate_bytes(data: bytes, filename: str) -> Tuple[bool, Optional[str]]:
+        """Validate in-memory file content. Returns (is_valid, error_message)."""
+        if not data:
+            return False, "File is empty (0 bytes)"
+        if filename.lower().endswith('.pdf') and not data.startswith(_PDF_MAGIC):
+            return False, "Not a valid PDF file (missing PDF header)"
+        return True, None
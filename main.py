@@ -12,15 +12,52 @@ Modular invoice processing pipeline:
 Format: [Prefix_]SupplierName_#InvoiceNumber_DD-MM-YYYY_AmountCurrency[_Q1-2025].ext
 """
 
+import contextlib
 import json
 import logging
 import os
-
-from core.pipeline import InvoicePipeline
+import shutil
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Drive files downloaded and processed concurrently per request
+DRIVE_MAX_WORKERS = 8
+
+# Listed Drive files up to this size are processed in memory, not via /tmp
+DRIVE_IN_MEMORY_MAX_BYTES = 10 * 1024 * 1024
+
+# Local CLI runs with at least this many files extract in worker processes
+LOCAL_BATCH_MIN_FILES = 5
+
+# Buffer size for spooling multipart uploads to /tmp
+UPLOAD_COPY_BUFFER = 1024 * 1024
+
+# Shared pipeline for HTTP handlers, built on first use (see _get_pipeline)
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+# Vision client shared by the HTTP pipeline, set once built (see _get_vision_client)
+_vision_client = None
+
+
+def _dumps(obj) -> str:
+    """Serialize a response body, with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
 
 def process_invoice_http(request):
     """
@@ -29,38 +66,41 @@ def process_invoice_http(request):
     or JSON body with file_path for local processing.
     """
     try:
-        # Initialize pipeline (Vision client is optional for native PDFs)
-        vision_client = _get_vision_client()
-        pipeline = InvoicePipeline(vision_client=vision_client)
+        pipeline = _get_pipeline()
 
-        content_type = request.content_type or ''
+        content_type = _media_type(request)
 
-        if 'multipart/form-data' in content_type:
+        if content_type == 'multipart/form-data':
             # File upload
             file = request.files.get('file')
             if not file:
-                return json.dumps({"error": "No file uploaded"}), 400
-
-            # Save temporarily
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp:
-                file.save(tmp.name)
-                result = pipeline.process_file(tmp.name)
-                os.unlink(tmp.name)
-
-        elif 'application/json' in content_type:
+                return _dumps({"error": "No file uploaded"}), 400
+            if not pipeline.text_extractor.is_supported(file.filename or ''):
+                return _dumps({"error": "Unsupported file format"}), 400
+
+            # Save under the upload's own name (its accounting prefix drives the
+            # new filename) in a private directory that is always removed.
+            # Copy in large chunks rather than Werkzeug's 16KB default.
+            name = os.path.basename(file.filename.replace('\\', '/'))
+            with tempfile.TemporaryDirectory(prefix="invoice_upload_") as tmpdir:
+                path = os.path.join(tmpdir, name)
+                with open(path, 'wb', buffering=UPLOAD_COPY_BUFFER) as out:
+                    shutil.copyfileobj(file.stream, out, length=UPLOAD_COPY_BUFFER)
+                result = pipeline.process_file(path, unique_name=False)
+
+        elif content_type == 'application/json':
             # JSON body with file_path
             data = request.get_json()
             filepath = data.get('file_path')
             if not filepath:
-                return json.dumps({"error": "file_path required"}), 400
+                return _dumps({"error": "file_path required"}), 400
 
             include_vat = data.get('include_vat_quarter', True)
             debug = data.get('debug', False)
             result = pipeline.process_file(filepath, include_vat_quarter=include_vat, debug=debug)
 
         else:
-            return json.dumps({"error": "Unsupported content type"}), 400
+            return _dumps({"error": "Unsupported content type"}), 400
 
         response = {
             "original_filename": result.original_filename,
@@ -82,14 +122,14 @@ def process_invoice_http(request):
             response["supplier_unknown"] = True
             # Include text preview for the learning UI
             if result.raw_text:
-                lines = [l.strip() for l in result.raw_text.split('\n') if l.strip()]
-                response["text_preview"] = lines[:15]
+                from core.extractors.supplier_learner import non_empty_lines
+                response["text_preview"] = list(islice(non_empty_lines(result.raw_text), 15))
 
-        return json.dumps(response), 200
+        return _dumps(response), 200
 
     except Exception as e:
         logger.error(f"Error processing invoice: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}), 500
+        return _dumps({"error": str(e)}), 500
 
 
 def learn_supplier_http(request):
@@ -103,13 +143,13 @@ def learn_supplier_http(request):
     }
     """
     try:
-        if 'application/json' not in (request.content_type or ''):
-            return json.dumps({"error": "Content-Type must be application/json"}), 400
+        if _media_type(request) != 'application/json':
+            return _dumps({"error": "Content-Type must be application/json"}), 400
 
         data = request.get_json()
         supplier_name = data.get('supplier_name')
         if not supplier_name:
-            return json.dumps({"error": "supplier_name is required"}), 400
+            return _dumps({"error": "supplier_name is required"}), 400
 
         from core.extractors.supplier_learner import create_supplier_template, save_supplier_template
 
@@ -121,8 +161,11 @@ def learn_supplier_http(request):
         )
 
         saved = save_supplier_template(template)
+        if saved and _pipeline is not None:
+            # Pick up the new template in the shared pipeline
+            _pipeline.supplier_extractor.register_template(template)
 
-        return json.dumps({
+        return _dumps({
             "saved": saved,
             "template": template,
             "message": f"Supplier '{supplier_name}' {'saved' if saved else 'already exists'}",
@@ -130,7 +173,7 @@ def learn_supplier_http(request):
 
     except Exception as e:
         logger.error(f"Error learning supplier: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}), 500
+        return _dumps({"error": str(e)}), 500
 
 
 def process_drive_http(request):
@@ -146,22 +189,20 @@ def process_drive_http(request):
     }
     """
     try:
-        if 'application/json' not in (request.content_type or ''):
-            return json.dumps({"error": "Content-Type must be application/json"}), 400
+        if _media_type(request) != 'application/json':
+            return _dumps({"error": "Content-Type must be application/json"}), 400
 
         data = request.get_json()
         folder_id = data.get('folder_id')
         file_id = data.get('file_id')
 
         if not folder_id and not file_id:
-            return json.dumps({"error": "folder_id or file_id required"}), 400
+            return _dumps({"error": "folder_id or file_id required"}), 400
 
         from core.drive import DriveConnector
-        import tempfile
 
         drive = DriveConnector()
-        vision_client = _get_vision_client()
-        pipeline = InvoicePipeline(vision_client=vision_client)
+        pipeline = _get_pipeline()
         include_vat = data.get('include_vat_quarter', True)
         do_rename = data.get('rename', False)
         move_to = data.get('move_to')
@@ -172,69 +213,135 @@ def process_drive_http(request):
         else:
             files = drive.list_invoices(folder_id)
 
-        results = []
         with tempfile.TemporaryDirectory(prefix="invoice_drive_") as tmpdir:
-            for f in files:
-                fid = f['id']
-                local_path = drive.download(fid, dest_dir=tmpdir)
-
-                result = pipeline.process_file(local_path, include_vat_quarter=include_vat)
-
-                entry = {
-                    "drive_file_id": fid,
-                    "original_filename": result.original_filename,
-                    "new_filename": result.new_filename,
-                    "supplier": result.invoice_data.supplier,
-                    "invoice_number": result.invoice_data.invoice_number,
-                    "date": result.invoice_data.format_date(),
-                    "amount": str(result.invoice_data.amount) if result.invoice_data.amount else None,
-                    "currency": result.invoice_data.currency,
-                    "confidence": result.invoice_data.confidence,
-                    "vat_quarter": result.vat_quarter,
-                    "errors": result.errors,
-                    "renamed": False,
-                    "moved": False,
-                }
-
-                if result.invoice_data.supplier == "Unknown":
-                    entry["supplier_unknown"] = True
-
-                # Rename in Drive if requested
-                if do_rename and not result.errors:
-                    drive.rename(fid, result.new_filename)
-                    entry["renamed"] = True
-
-                # Move to processed folder if requested
-                if move_to and not result.errors:
-                    drive.move_to_folder(fid, move_to)
-                    entry["moved"] = True
-
-                results.append(entry)
-
-                # Clean up local file
-                try:
-                    os.unlink(local_path)
-                except OSError:
-                    pass
-
-        return json.dumps({
+            # Download + extract concurrently: both are dominated by network
+            # waits (Drive, Vision) that release the GIL. PDFium text
+            # extraction itself is serialized by a lock in pdfplumber_extractor
+            workers = max(1, min(DRIVE_MAX_WORKERS, len(files)))
+            with _thread_pool(workers) as pool:
+                results = list(pool.map(
+                    lambda f: _process_drive_file(drive, pipeline, f, tmpdir, include_vat),
+                    files,
+                ))
+
+        # Apply Drive changes in batched requests rather than one call per file;
+        # when moving, the rename rides along in the same update request
+        new_names = {
+            entry["drive_file_id"]: entry["new_filename"]
+            for entry in results if not entry["errors"]
+        }
+        if move_to and new_names:
+            moved = drive.move_many(
+                list(new_names),
+                move_to,
+                new_names=new_names if do_rename else None,
+                known_parents={f['id']: f['parents'] for f in files if 'parents' in f},
+            )
+            for entry in results:
+                entry["moved"] = entry["drive_file_id"] in moved
+                entry["renamed"] = bool(do_rename) and entry["moved"]
+        elif do_rename and new_names:
+            renamed = drive.rename_many(new_names)
+            for entry in results:
+                entry["renamed"] = entry["drive_file_id"] in renamed
+
+        return _dumps({
             "processed": len(results),
             "results": results,
         }), 200
 
     except Exception as e:
         logger.error(f"Error processing Drive invoices: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}), 500
+        return _dumps({"error": str(e)}), 500
+
+
+def _process_drive_file(drive, pipeline, file_info: dict, tmpdir: str, include_vat: bool) -> dict:
+    """Download one Drive file, run the pipeline on it and build its result entry."""
+    fid = file_info['id']
+    local_path = None
+    size = int(file_info.get('size') or 0)
+
+    if file_info.get('name') and 0 < size <= DRIVE_IN_MEMORY_MAX_BYTES:
+        # Small listed file: keep it in memory, no temp file round-trip
+        data = drive.download_bytes(fid)
+        result = pipeline.process_bytes(data, file_info['name'], include_vat_quarter=include_vat)
+    else:
+        # Own directory per file: Drive allows duplicate names in a folder.
+        # A name from the folder listing saves the metadata request.
+        local_path = drive.download(
+            fid, dest_dir=tempfile.mkdtemp(dir=tmpdir), filename=file_info.get('name')
+        )
+        result = pipeline.process_file(
+            local_path, include_vat_quarter=include_vat, unique_name=False
+        )
+
+    entry = {
+        "drive_file_id": fid,
+        "original_filename": result.original_filename,
+        "new_filename": result.new_filename,
+        "supplier": result.invoice_data.supplier,
+        "invoice_number": result.invoice_data.invoice_number,
+        "date": result.invoice_data.format_date(),
+        "amount": str(result.invoice_data.amount) if result.invoice_data.amount else None,
+        "currency": result.invoice_data.currency,
+        "confidence": result.invoice_data.confidence,
+        "vat_quarter": result.vat_quarter,
+        "errors": result.errors,
+        "renamed": False,
+        "moved": False,
+    }
+
+    if result.invoice_data.supplier == "Unknown":
+        entry["supplier_unknown"] = True
+
+    # Clean up local file
+    if local_path:
+        try:
+            os.unlink(local_path)
+        except OSError:
+            pass
+
+    return entry
+
+
+def _media_type(request) -> str:
+    """Request media type without parameters such as boundary or charset."""
+    return (request.content_type or '').split(';', 1)[0].strip().lower()
+
+
+def _get_pipeline():
+    """
+    Return the shared InvoicePipeline, building it on first call.
+    The pipeline stack (pdfplumber, dateparser, Vision) is imported here
+    rather than at module load, keeping it off the cold-start path.
+    Concurrent first requests share one build instead of racing.
+    """
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                from core.pipeline import InvoicePipeline
+                # Vision client is optional for native PDFs; only built once
+                # a file actually needs OCR
+                _pipeline = InvoicePipeline(vision_client_factory=_get_vision_client)
+    return _pipeline
 
 
 def _get_vision_client():
-    """Get Google Cloud Vision client if credentials are available."""
-    try:
-        from google.cloud import vision
-        return vision.ImageAnnotatorClient()
-    except Exception:
-        logger.warning("Google Cloud Vision not available - only native PDFs will work")
-        return None
+    """
+    Get Google Cloud Vision client if credentials are available.
+    Only a successful client is kept, so the process holds at most one
+    client and gRPC channel while a transient credentials or network
+    failure is retried on the next OCR call.
+    """
+    global _vision_client
+    if _vision_client is None:
+        try:
+            from google.cloud import vision
+            _vision_client = vision.ImageAnnotatorClient()
+        except Exception:
+            logger.warning("Google Cloud Vision not available - only native PDFs will work")
+    return _vision_client
 
 
 # ─────────────────────────────────────────────────────────
@@ -243,16 +350,19 @@ def _get_vision_client():
 
 def _print_result(result):
     """Print extraction result to console."""
-    print(f"{result.original_filename} -> {result.new_filename}")
-    print(f"  Supplier: {result.invoice_data.supplier}")
-    print(f"  Invoice#: {result.invoice_data.invoice_number}")
-    print(f"  Date: {result.invoice_data.format_date()}")
-    print(f"  Amount: {result.invoice_data.format_amount()}")
-    print(f"  Confidence: {result.invoice_data.confidence:.0%}")
-    print(f"  Method: {result.invoice_data.extraction_method}")
+    lines = [
+        f"{result.original_filename} -> {result.new_filename}",
+        f"  Supplier: {result.invoice_data.supplier}",
+        f"  Invoice#: {result.invoice_data.invoice_number}",
+        f"  Date: {result.invoice_data.format_date()}",
+        f"  Amount: {result.invoice_data.format_amount()}",
+        f"  Confidence: {result.invoice_data.confidence:.0%}",
+        f"  Method: {result.invoice_data.extraction_method}",
+    ]
     if result.vat_quarter:
-        print(f"  VAT Quarter: {result.vat_quarter}")
-    print()
+        lines.append(f"  VAT Quarter: {result.vat_quarter}")
+    # One write per invoice instead of one per line
+    print("\n".join(lines), end="\n\n")
 
 
 def _handle_supplier_learning(result, pipeline, no_learn=False):
@@ -261,16 +371,17 @@ def _handle_supplier_learning(result, pipeline, no_learn=False):
         return result
 
     from core.extractors.supplier_learner import prompt_supplier_info
-    learned = prompt_supplier_info(result.raw_text)
+    # A saved supplier is detected in later files without reloading
+    # suppliers.json; one the user declined to save only applies here
+    learned = prompt_supplier_info(
+        result.raw_text, on_saved=pipeline.supplier_extractor.register_template
+    )
     if learned:
         result = pipeline.reprocess_with_supplier(
             result,
             supplier_name=learned['display_name'],
             supplier_template=learned,
         )
-        # Reload supplier extractor to pick up the new template
-        from core.extractors.supplier import SupplierExtractor
-        pipeline.supplier_extractor = SupplierExtractor()
 
     return result
 
@@ -279,34 +390,37 @@ def main():
     """CLI entry point for local testing and batch processing."""
     import argparse
 
+    # Options shared by every command
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--no-vat", action="store_true", help="Skip VAT quarter")
+    common.add_argument("--no-learn", action="store_true", help="Skip supplier learning prompts")
+    common.add_argument("--debug", action="store_true", help="Enable debug logging")
+
     parser = argparse.ArgumentParser(description="Invoice Renamer V5")
     subparsers = parser.add_subparsers(dest="command")
 
     # ── Local files command (default) ─────────────────────
-    local_parser = subparsers.add_parser("local", help="Process local files")
+    local_parser = subparsers.add_parser("local", parents=[common], help="Process local files")
     local_parser.add_argument("files", nargs="+", help="Files to process")
     local_parser.add_argument("--rename", action="store_true", help="Actually rename files")
-    local_parser.add_argument("--no-vat", action="store_true", help="Skip VAT quarter")
-    local_parser.add_argument("--no-learn", action="store_true", help="Skip supplier learning prompts")
-    local_parser.add_argument("--debug", action="store_true", help="Enable debug logging")
 
     # ── Google Drive command ──────────────────────────────
-    drive_parser = subparsers.add_parser("drive", help="Process invoices from Google Drive")
+    drive_parser = subparsers.add_parser(
+        "drive", parents=[common], help="Process invoices from Google Drive"
+    )
     drive_parser.add_argument("folder_id", help="Google Drive folder ID")
     drive_parser.add_argument("--rename", action="store_true", help="Rename files in Drive")
     drive_parser.add_argument("--move-to", help="Move processed files to this Drive folder ID")
-    drive_parser.add_argument("--no-vat", action="store_true", help="Skip VAT quarter")
-    drive_parser.add_argument("--no-learn", action="store_true", help="Skip supplier learning prompts")
-    drive_parser.add_argument("--debug", action="store_true", help="Enable debug logging")
 
     # Also support the old direct-files syntax (no subcommand)
-    parser.add_argument("files", nargs="*", help=argparse.SUPPRESS)
-    parser.add_argument("--rename", action="store_true", help="Actually rename files")
-    parser.add_argument("--no-vat", action="store_true", help="Skip VAT quarter")
-    parser.add_argument("--no-learn", action="store_true", help="Skip supplier learning prompts")
-    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    argv = sys.argv[1:]
+    if argv and argv[0] not in subparsers.choices and argv[0] not in ("-h", "--help"):
+        argv.insert(0, "local")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return
 
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
@@ -314,52 +428,110 @@ def main():
     # Route to the right handler
     if args.command == "drive":
         _main_drive(args)
-    elif args.command == "local":
-        _main_local(args)
-    elif args.files:
-        # Backward-compat: direct file args without subcommand
-        _main_local(args)
     else:
-        parser.print_help()
+        _main_local(args)
 
 
 def _main_local(args):
     """Process local files."""
-    vision_client = _get_vision_client()
-    pipeline = InvoicePipeline(vision_client=vision_client)
+    pipeline = _get_pipeline()
+    include_vat = not args.no_vat
+    debug = getattr(args, 'debug', False)
 
+    # Extraction is CPU-bound, so larger batches go to worker processes;
+    # learning prompts and renames below stay sequential, in input order
+    paths = []
     for filepath in args.files:
-        if not os.path.exists(filepath):
+        if os.path.exists(filepath):
+            paths.append(filepath)
+        else:
             print(f"File not found: {filepath}")
-            continue
-
-        result = pipeline.process_file(
-            filepath,
-            include_vat_quarter=not args.no_vat,
-            debug=getattr(args, 'debug', False),
+    if len(paths) >= LOCAL_BATCH_MIN_FILES and not debug:
+        results = pipeline.process_batch(paths, include_vat_quarter=include_vat)
+    else:
+        results = (
+            pipeline.process_file(p, include_vat_quarter=include_vat, debug=debug)
+            for p in paths
         )
+    known_templates = len(pipeline.supplier_extractor.templates)
 
+    for filepath, result in zip(paths, results):
         if result.errors:
             print(f"ERRORS for {result.original_filename}: {result.errors}")
             continue
 
+        # Renamed or removed since extraction, e.g. a path given twice
+        if not os.path.exists(filepath):
+            print(f"File not found: {filepath}")
+            continue
+
+        # A supplier learned earlier in this run may match this file now
+        if (result.invoice_data.supplier == "Unknown"
+                and len(pipeline.supplier_extractor.templates) != known_templates):
+            result = pipeline.process_file(filepath, include_vat_quarter=include_vat, debug=debug)
+
         result = _handle_supplier_learning(result, pipeline, no_learn=args.no_learn)
         _print_result(result)
 
         if args.rename:
-            dirpath = os.path.dirname(filepath)
+            dirpath = os.path.dirname(filepath) or os.curdir
             new_path = os.path.join(dirpath, result.new_filename)
-            if not os.path.exists(new_path):
-                os.rename(filepath, new_path)
+            renamed = _rename_no_clobber(filepath, new_path)
+            if not renamed:
+                # Names were made unique before earlier files in this run were
+                # renamed; pick the next free one now
+                from core.naming import generate_filename
+                result.new_filename = generate_filename(
+                    data=result.invoice_data,
+                    original_filename=result.original_filename,
+                    accounting_prefix=result.accounting_prefix,
+                    vat_quarter=result.vat_quarter,
+                    dirpath=dirpath,
+                )
+                new_path = os.path.join(dirpath, result.new_filename)
+                renamed = _rename_no_clobber(filepath, new_path)
+            if renamed:
                 print(f"  RENAMED: {result.new_filename}")
             else:
                 print(f"  SKIPPED: {result.new_filename} already exists")
 
 
+def _rename_no_clobber(src: str, dst: str) -> bool:
+    """
+    Rename src to dst unless dst exists; returns False when it does.
+    A hard link fails atomically on an existing target, so there is no
+    check-then-rename race; filesystems without links fall back to that.
+    """
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        return False
+    except OSError:
+        if os.path.exists(dst):
+            return False
+        os.rename(src, dst)
+        return True
+    os.unlink(src)
+    return True
+
+
+@contextlib.contextmanager
+def _thread_pool(max_workers: int):
+    """
+    ThreadPoolExecutor that, when the body raises (including Ctrl-C),
+    cancels queued work and returns without waiting for it.
+    """
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        yield pool
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+
 def _main_drive(args):
     """Process invoices from Google Drive."""
-    import tempfile
-
     try:
         from core.drive import DriveConnector
     except ImportError as e:
@@ -382,45 +554,72 @@ def _main_drive(args):
         print(f"  {f['name']} ({f['mimeType']})")
     print()
 
-    vision_client = _get_vision_client()
-    pipeline = InvoicePipeline(vision_client=vision_client)
+    pipeline = _get_pipeline()
+    known_templates = len(pipeline.supplier_extractor.templates)
 
-    with tempfile.TemporaryDirectory(prefix="invoice_drive_") as tmpdir:
-        for f in files:
-            print(f"--- Processing: {f['name']} ---")
-
-            local_path = drive.download(f['id'], dest_dir=tmpdir)
-
-            result = pipeline.process_file(
-                local_path,
-                include_vat_quarter=not args.no_vat,
-                debug=args.debug,
-            )
-
-            if result.errors:
-                print(f"ERRORS: {result.errors}")
-                continue
+    def _fetch(f):
+        local_path = drive.download(
+            f['id'], dest_dir=tempfile.mkdtemp(dir=tmpdir), filename=f.get('name')
+        )
+        result = pipeline.process_file(
+            local_path,
+            include_vat_quarter=not args.no_vat,
+            debug=args.debug,
+            unique_name=False,
+        )
+        return local_path, result
 
-            result = _handle_supplier_learning(result, pipeline, no_learn=args.no_learn)
-            _print_result(result)
+    with tempfile.TemporaryDirectory(prefix="invoice_drive_") as tmpdir:
+        # Downloads and extraction run ahead in worker threads; results are
+        # consumed in listing order so prompts and output stay sequential.
+        # PDFium is not thread-safe: native-PDF extraction takes the lock in
+        # pdfplumber_extractor, so only the Drive and Vision I/O overlap
+        workers = max(1, min(DRIVE_MAX_WORKERS, len(files)))
+        with _thread_pool(workers) as pool:
+            for f, (local_path, result) in zip(files, pool.map(_fetch, files)):
+                print(f"--- Processing: {f['name']} ---")
+
+                if result.errors:
+                    print(f"ERRORS: {result.errors}")
+                    continue
+
+                # A supplier learned earlier in this run may match this file now
+                if (result.invoice_data.supplier == "Unknown"
+                        and len(pipeline.supplier_extractor.templates) != known_templates):
+                    result = pipeline.process_file(
+                        local_path,
+                        include_vat_quarter=not args.no_vat,
+                        debug=args.debug,
+                        unique_name=False,
+                    )
+
+                result = _handle_supplier_learning(result, pipeline, no_learn=args.no_learn)
+                _print_result(result)
+
+                # Rename in Drive
+                if args.rename:
+                    drive.rename(f['id'], result.new_filename)
+                    print(f"  RENAMED in Drive: {result.new_filename}")
+
+                # Move to processed folder
+                if args.move_to:
+                    drive.move_to_folder(f['id'], args.move_to)
+                    print(f"  MOVED to folder: {args.move_to}")
+
+                # Clean up local temp
+                try:
+                    os.unlink(local_path)
+                except OSError:
+                    pass
 
-            # Rename in Drive
-            if args.rename:
-                drive.rename(f['id'], result.new_filename)
-                print(f"  RENAMED in Drive: {result.new_filename}")
+    print(f"\nDone! Processed {len(files)} invoice(s).")
 
-            # Move to processed folder
-            if args.move_to:
-                drive.move_to_folder(f['id'], args.move_to)
-                print(f"  MOVED to folder: {args.move_to}")
 
-            # Clean up local temp
-            try:
-                os.unlink(local_path)
-            except OSError:
-                pass
 
-    print(f"\nDone! Processed {len(files)} invoice(s).")
+# Build the shared pipeline during instance start-up rather than on the
+# first request, when the deployment opts in (e.g. with min instances)
+if os.environ.get('INVOICE_EAGER_INIT'):
+    _get_pipeline()
 
 
 if __name__ == "__main__":
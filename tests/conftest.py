@@ -1,9 +1,19 @@
 """Shared test configuration and fixtures."""
 
+import functools
 import os
+import re
+import sys
+
 import pytest
 
+# Make the project root importable once for every test module
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', 'config')
 
 
 @pytest.fixture
@@ -11,48 +21,68 @@ def fixtures_dir():
     return FIXTURES_DIR
 
 
+@functools.lru_cache(maxsize=None)
 def load_fixture(name: str) -> str:
-    """Load a text fixture file."""
+    """Load a text fixture file (read once per session; str is immutable)."""
     path = os.path.join(FIXTURES_DIR, name)
     with open(path, encoding='utf-8') as f:
         return f.read()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def etisalat_text():
     return load_fixture('etisalat_sample.txt')
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def aws_text():
     return load_fixture('aws_sample.txt')
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def zoho_text():
     return load_fixture('zoho_sample.txt')
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def cursor_text():
     return load_fixture('cursor_sample.txt')
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def hilton_text():
     return load_fixture('hilton_sample.txt')
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def du_text():
     return load_fixture('du_sample.txt')
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def french_text():
     return load_fixture('french_invoice_sample.txt')
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def webkul_text():
     return load_fixture('webkul_sample.txt')
+
+
+@pytest.fixture(scope="session")
+def classifier():
+    """VAT quarter classifier; classify() is read-only, so one is shared."""
+    from core.classifier import VATQuarterClassifier
+    return VATQuarterClassifier(config_path=os.path.join(CONFIG_DIR, 'companies.json'))
+
+
+@pytest.fixture(scope="session")
+def filename_re():
+    """
+    Full generated-filename structure, with prefix and supplier groups:
+    [Prefix_]Supplier_#Number_DD-MM-YYYY_AmountCUR[_Qn-YYYY].ext
+    """
+    return re.compile(
+        r'(?P<prefix>[^_]+_)?(?P<supplier>[^_]+)_#[^_]+_\d{2}-\d{2}-\d{4}_'
+        r'\d+\.\d{2}[A-Z]{3}(?:_Q[1-4]-\d{4})?\.[^.]+'
+    )
@@ -1,10 +1,6 @@
 """Tests for accounting prefix extraction."""
 
 import pytest
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from core.extractors.accounting_prefix import extract_accounting_prefix
 
@@ -1,12 +1,8 @@
 """Tests for date extraction."""
 
 import pytest
-import sys
-import os
 from datetime import date
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
 from core.extractors.date_amount import extract_date
 
 
@@ -41,35 +37,16 @@ class TestDateContextual:
 class TestDateFormats:
     """Test various date format parsing."""
 
-    def test_dd_mm_yyyy_slash(self):
-        text = "Invoice Date: 24/11/2023"
-        result = extract_date(text)
-        assert result == date(2023, 11, 24)
-
-    def test_ordinal_date(self):
-        text = "Invoice Date: 22nd Dec 2024"
-        result = extract_date(text)
-        assert result == date(2024, 12, 22)
-
-    def test_month_name_full(self):
-        text = "Tax Invoice Issue Date 19 February 2025"
-        result = extract_date(text)
-        assert result == date(2025, 2, 19)
-
-    def test_abbreviated_month(self):
-        text = "DATE OF ISSUE: 24-Feb-2025"
-        result = extract_date(text)
-        assert result == date(2025, 2, 24)
-
-    def test_iso_format(self):
-        text = "Date: 2025-03-15"
-        result = extract_date(text)
-        assert result == date(2025, 3, 15)
-
-    def test_dot_separator(self):
-        text = "Date: 15.03.2025"
-        result = extract_date(text)
-        assert result == date(2025, 3, 15)
+    @pytest.mark.parametrize("text,expected", [
+        pytest.param("Invoice Date: 24/11/2023", date(2023, 11, 24), id="dd_mm_yyyy_slash"),
+        pytest.param("Invoice Date: 22nd Dec 2024", date(2024, 12, 22), id="ordinal"),
+        pytest.param("Tax Invoice Issue Date 19 February 2025", date(2025, 2, 19), id="month_name_full"),
+        pytest.param("DATE OF ISSUE: 24-Feb-2025", date(2025, 2, 24), id="abbreviated_month"),
+        pytest.param("Date: 2025-03-15", date(2025, 3, 15), id="iso"),
+        pytest.param("Date: 15.03.2025", date(2025, 3, 15), id="dot_separator"),
+    ])
+    def test_parses(self, text, expected):
+        assert extract_date(text) == expected
 
 
 class TestDateFrench:
@@ -90,6 +67,13 @@ Payment Date: 20/03/2025"""
         result = extract_date(text)
         assert result == date(2025, 2, 15)
 
+    def test_template_context_tried_first(self):
+        """Supplier date contexts win over the generic labels, wherever they sit."""
+        text = "Invoice Date: 01/02/2025\nBilling Period End: 28/02/2025"
+        assert extract_date(text) == date(2025, 2, 1)
+        template = {"date_context": ["Billing Period End"]}
+        assert extract_date(text, template) == date(2025, 2, 28)
+
     def test_no_date_returns_none(self):
         text = "No date information here at all"
         result = extract_date(text)
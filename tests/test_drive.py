@@ -1,22 +1,64 @@
 """Tests for Google Drive connector (mocked — no real API calls)."""
 
 import os
-import sys
-from unittest.mock import MagicMock, patch, mock_open
+from unittest.mock import ANY, MagicMock, patch, mock_open
 
 import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+class _FakeDownloader:
+    """MediaIoBaseDownload stand-in that writes a fixed body in one chunk."""
+
+    def __init__(self, fd, request, chunksize=None):
+        self.fd = fd
+
+    def next_chunk(self, num_retries=0):
+        self.fd.write(b'%PDF-1.4 test')
+        return None, True
+
+
+@pytest.fixture
+def mock_service():
+    """Drive service mock returned by DriveConnector._build_service."""
+    with patch('core.drive.DriveConnector._build_service') as mock_build:
+        mock_build.return_value = MagicMock()
+        yield mock_build.return_value
+
+
+class TestDriveServiceCache:
+    """Test that built Drive services are reused."""
+
+    def test_service_reused_across_connectors(self, monkeypatch):
+        import core.drive
+        from core.drive import DriveConnector
+
+        monkeypatch.setattr(core.drive._service_cache, 'services', {}, raising=False)
+        with patch('core.drive.DriveConnector._create_service') as mock_create:
+            first = DriveConnector()
+            second = DriveConnector()
+
+        mock_create.assert_called_once()
+        assert first.service is second.service
+
+    def test_credentials_shared_across_threads(self, monkeypatch):
+        import core.drive
+        from concurrent.futures import ThreadPoolExecutor
+        from core.drive import DriveConnector
+
+        monkeypatch.setattr(core.drive, '_credentials_cache', {})
+        with patch('core.drive.DriveConnector._load_credentials') as mock_load, \
+                patch('googleapiclient.discovery.build') as mock_build:
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                list(pool.map(lambda _: DriveConnector._create_service(), range(3)))
+
+        mock_load.assert_called_once()
+        assert mock_build.call_count == 3
 
 
 class TestDriveConnectorListInvoices:
     """Test listing invoices from a Drive folder."""
 
-    @patch('core.drive.DriveConnector._build_service')
-    def test_list_invoices_returns_files(self, mock_build):
-        mock_service = MagicMock()
-        mock_build.return_value = mock_service
-
+    def test_list_invoices_returns_files(self, mock_service):
         mock_service.files().list().execute.return_value = {
             'files': [
                 {'id': '1', 'name': 'invoice.pdf', 'mimeType': 'application/pdf', 'modifiedTime': '2025-01-15'},
@@ -31,11 +73,7 @@ class TestDriveConnectorListInvoices:
         assert len(files) == 2
         assert files[0]['name'] == 'invoice.pdf'
 
-    @patch('core.drive.DriveConnector._build_service')
-    def test_list_invoices_empty_folder(self, mock_build):
-        mock_service = MagicMock()
-        mock_build.return_value = mock_service
-
+    def test_list_invoices_empty_folder(self, mock_service):
         mock_service.files().list().execute.return_value = {'files': []}
 
         from core.drive import DriveConnector
@@ -44,43 +82,72 @@ class TestDriveConnectorListInvoices:
 
         assert files == []
 
+    def test_list_invoices_follows_page_tokens(self, mock_service):
+        mock_service.files().list().execute.side_effect = [
+            {'files': [{'id': '1'}, {'id': '2'}], 'nextPageToken': 'page2'},
+            {'files': [{'id': '3'}]},
+        ]
+
+        from core.drive import DriveConnector
+        drive = DriveConnector()
+        files = drive.list_invoices('big_folder')
+
+        assert [f['id'] for f in files] == ['1', '2', '3']
+        mock_service.files().list.assert_called_with(
+            q=ANY, pageSize=ANY, pageToken='page2', fields=ANY, orderBy=ANY,
+        )
+
 
 class TestDriveConnectorDownload:
     """Test downloading files from Drive."""
 
-    @patch('core.drive.DriveConnector._build_service')
-    def test_download_creates_local_file(self, mock_build, tmp_path):
-        mock_service = MagicMock()
-        mock_build.return_value = mock_service
-
+    def test_download_creates_local_file(self, mock_service, tmp_path):
         # Mock file metadata
         mock_service.files().get().execute.return_value = {'name': 'test.pdf'}
 
-        # Mock download: simulate MediaIoBaseDownload
-        mock_request = MagicMock()
-        mock_service.files().get_media.return_value = mock_request
-
         from core.drive import DriveConnector
 
-        with patch('googleapiclient.http.MediaIoBaseDownload') as mock_dl_class:
-            mock_dl = MagicMock()
-            mock_dl.next_chunk.return_value = (None, True)  # Done immediately
-            mock_dl_class.return_value = mock_dl
-
+        # Mock download: simulate MediaIoBaseDownload writing into the file
+        with patch('googleapiclient.http.MediaIoBaseDownload', _FakeDownloader):
             drive = DriveConnector()
             path = drive.download('file123', dest_dir=str(tmp_path))
 
         assert path == os.path.join(str(tmp_path), 'test.pdf')
+        with open(path, 'rb') as f:
+            assert f.read() == b'%PDF-1.4 test'
+
+    def test_download_bytes_returns_content(self, mock_service):
+        mock_service.files().get_media().execute.return_value = b'%PDF-1.4 test'
+
+        from core.drive import DriveConnector
+        drive = DriveConnector()
+
+        assert drive.download_bytes('file123') == b'%PDF-1.4 test'
+        mock_service.files().get_media.assert_called_with(fileId='file123')
+
+
+class TestDriveConnectorDownloadMany:
+    """Test concurrent downloads."""
+
+    def test_download_many_preserves_order(self, mock_service, tmp_path):
+        # Metadata name derived from the requested file ID
+        mock_service.files.return_value.get.side_effect = lambda fileId, fields: MagicMock(
+            execute=MagicMock(return_value={'name': f'{fileId}.pdf'})
+        )
+
+        from core.drive import DriveConnector
+
+        with patch('googleapiclient.http.MediaIoBaseDownload', _FakeDownloader):
+            drive = DriveConnector()
+            paths = drive.download_many(['a', 'b', 'c'], dest_dir=str(tmp_path), max_workers=3)
+
+        assert paths == [os.path.join(str(tmp_path), f'{fid}.pdf') for fid in 'abc']
 
 
 class TestDriveConnectorRename:
     """Test renaming files in Drive."""
 
-    @patch('core.drive.DriveConnector._build_service')
-    def test_rename_calls_api(self, mock_build):
-        mock_service = MagicMock()
-        mock_build.return_value = mock_service
-
+    def test_rename_calls_api(self, mock_service):
         mock_service.files().update().execute.return_value = {
             'id': 'file123',
             'name': 'AWS_#123_01-01-2025_500USD.pdf',
@@ -96,11 +163,7 @@ class TestDriveConnectorRename:
 class TestDriveConnectorMove:
     """Test moving files between Drive folders."""
 
-    @patch('core.drive.DriveConnector._build_service')
-    def test_move_to_folder(self, mock_build):
-        mock_service = MagicMock()
-        mock_build.return_value = mock_service
-
+    def test_move_to_folder(self, mock_service):
         mock_service.files().get().execute.return_value = {'parents': ['old_folder']}
         mock_service.files().update().execute.return_value = {
             'id': 'file123',
@@ -113,3 +176,159 @@ class TestDriveConnectorMove:
         result = drive.move_to_folder('file123', 'new_folder')
 
         assert result['parents'] == ['new_folder']
+
+
+class _FakeBatch:
+    """Minimal BatchHttpRequest stand-in that answers every request with its ID."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.request_ids = []
+
+    def add(self, request, request_id):
+        self.request_ids.append(request_id)
+
+    def execute(self):
+        for request_id in self.request_ids:
+            self.callback(request_id, {'id': request_id, 'parents': ['old_folder']}, None)
+
+
+class _FlakyBatch(_FakeBatch):
+    """_FakeBatch that fails listed request IDs with queued errors first."""
+
+    def __init__(self, callback, failures):
+        super().__init__(callback)
+        self.failures = failures
+
+    def execute(self):
+        for request_id in self.request_ids:
+            errors = self.failures.get(request_id)
+            if errors:
+                self.callback(request_id, None, errors.pop(0))
+            else:
+                self.callback(request_id, {'id': request_id}, None)
+
+
+def _http_error(status, headers=None):
+    import httplib2
+    from googleapiclient.errors import HttpError
+    return HttpError(httplib2.Response({'status': status, **(headers or {})}), b'')
+
+
+class TestDriveConnectorBatch:
+    """Test batched rename / move operations."""
+
+    def test_rename_many_splits_into_batches(self, mock_service):
+        batches = []
+        mock_service.new_batch_http_request.side_effect = (
+            lambda callback: batches.append(_FakeBatch(callback)) or batches[-1]
+        )
+
+        from core.drive import DriveConnector, BATCH_MAX_SIZE
+        drive = DriveConnector()
+        new_names = {f'file{i}': f'name{i}.pdf' for i in range(BATCH_MAX_SIZE + 5)}
+        results = drive.rename_many(new_names)
+
+        assert set(results) == set(new_names)
+        assert [len(b.request_ids) for b in batches] == [BATCH_MAX_SIZE, 5]
+
+    @patch('core.drive.time.sleep')
+    def test_retries_transient_sub_request_errors(self, mock_sleep, mock_service):
+        failures = {'b': [_http_error(429, {'retry-after': '3'})]}
+        mock_service.new_batch_http_request.side_effect = (
+            lambda callback: _FlakyBatch(callback, failures)
+        )
+
+        from core.drive import DriveConnector
+        drive = DriveConnector()
+        results = drive.rename_many({'a': 'a.pdf', 'b': 'b.pdf', 'c': 'c.pdf'})
+
+        assert set(results) == {'a', 'b', 'c'}
+        mock_sleep.assert_called_once_with(3.0)
+
+    @patch('core.drive.time.sleep')
+    def test_skips_non_retryable_sub_request_errors(self, mock_sleep, mock_service):
+        failures = {'b': [_http_error(404)]}
+        mock_service.new_batch_http_request.side_effect = (
+            lambda callback: _FlakyBatch(callback, failures)
+        )
+
+        from core.drive import DriveConnector
+        drive = DriveConnector()
+        results = drive.rename_many({'a': 'a.pdf', 'b': 'b.pdf'})
+
+        assert set(results) == {'a'}
+        mock_sleep.assert_not_called()
+
+    def test_move_many(self, mock_service):
+        mock_service.new_batch_http_request.side_effect = lambda callback: _FakeBatch(callback)
+
+        from core.drive import DriveConnector
+        drive = DriveConnector()
+        results = drive.move_many(['a', 'b', 'a'], 'new_folder')
+
+        assert set(results) == {'a', 'b'}
+        mock_service.files().update.assert_any_call(
+            fileId='a', addParents='new_folder', removeParents='old_folder',
+            fields='id, name, parents',
+        )
+
+    def test_move_many_renames_in_same_update(self, mock_service):
+        mock_service.new_batch_http_request.side_effect = lambda callback: _FakeBatch(callback)
+
+        from core.drive import DriveConnector
+        drive = DriveConnector()
+        drive.move_many(['a', 'b'], 'new_folder', new_names={'a': 'renamed.pdf'})
+
+        mock_service.files().update.assert_any_call(
+            fileId='a', addParents='new_folder', removeParents='old_folder',
+            fields='id, name, parents', body={'name': 'renamed.pdf'},
+        )
+        mock_service.files().update.assert_any_call(
+            fileId='b', addParents='new_folder', removeParents='old_folder',
+            fields='id, name, parents',
+        )
+
+    def test_move_many_uses_known_parents(self, mock_service):
+        mock_service.new_batch_http_request.side_effect = lambda callback: _FakeBatch(callback)
+
+        from core.drive import DriveConnector
+        drive = DriveConnector()
+        drive.move_many(['a', 'b'], 'new_folder', known_parents={'a': ['listed_folder']})
+
+        mock_service.files().get.assert_called_once_with(fileId='b', fields='parents')
+        mock_service.files().update.assert_any_call(
+            fileId='a', addParents='new_folder', removeParents='listed_folder',
+            fields='id, name, parents',
+        )
+
+
+class TestExecuteWithRetry:
+    """Test retry of transient Drive API errors."""
+
+    @patch('core.drive.time.sleep')
+    def test_retries_transient_errors(self, mock_sleep):
+        from core.drive import _execute_with_retry
+
+        request = MagicMock()
+        request.execute.side_effect = [
+            _http_error(503),
+            _http_error(429, {'retry-after': '7'}),
+            {'id': 'ok'},
+        ]
+
+        assert _execute_with_retry(request) == {'id': 'ok'}
+        assert request.execute.call_count == 3
+        assert mock_sleep.call_args_list[1].args == (7.0,)
+
+    @patch('core.drive.time.sleep')
+    def test_does_not_retry_client_errors(self, mock_sleep):
+        from googleapiclient.errors import HttpError
+        from core.drive import _execute_with_retry
+
+        request = MagicMock()
+        request.execute.side_effect = _http_error(404)
+
+        with pytest.raises(HttpError):
+            _execute_with_retry(request)
+        mock_sleep.assert_not_called()
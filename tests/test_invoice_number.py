@@ -1,10 +1,6 @@
 """Tests for invoice number extraction."""
 
 import pytest
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from core.extractors.invoice_number import extract_invoice_number
 
@@ -12,30 +8,16 @@ from core.extractors.invoice_number import extract_invoice_number
 class TestInvoiceNumberWithTemplate:
     """Test invoice number extraction using supplier templates."""
 
-    def test_etisalat_bill_number(self, etisalat_text):
-        template = {"invoice_number_pattern": r"Bill\s*number\s+(INV[0-9]+)"}
-        result = extract_invoice_number(etisalat_text, template)
-        assert result == "#INV1965257146"
-
-    def test_aws_invoice_number(self, aws_text):
-        template = {"invoice_number_pattern": r"Invoice\s*Number:\s*([0-9]+)"}
-        result = extract_invoice_number(aws_text, template)
-        assert result == "#2030491957"
-
-    def test_zoho_tax_invoice(self, zoho_text):
-        template = {"invoice_number_pattern": r"Tax\s*Invoice#\s*([0-9]+)"}
-        result = extract_invoice_number(zoho_text, template)
-        assert result == "#131898257"
-
-    def test_cursor_invoice_number(self, cursor_text):
-        template = {"invoice_number_pattern": r"Invoice\s*number\s+([A-Za-z0-9-]+)"}
-        result = extract_invoice_number(cursor_text, template)
-        assert result == "#HK7WPHRD-0001"
-
-    def test_du_bill_number(self, du_text):
-        template = {"invoice_number_pattern": r"(?:Your\s*)?bill\s*number\s*:?\s*([0-9]+)"}
-        result = extract_invoice_number(du_text, template)
-        assert result == "#0170948179"
+    @pytest.mark.parametrize("fixture,pattern,expected", [
+        pytest.param("etisalat_text", r"Bill\s*number\s+(INV[0-9]+)", "#INV1965257146", id="etisalat"),
+        pytest.param("aws_text", r"Invoice\s*Number:\s*([0-9]+)", "#2030491957", id="aws"),
+        pytest.param("zoho_text", r"Tax\s*Invoice#\s*([0-9]+)", "#131898257", id="zoho"),
+        pytest.param("cursor_text", r"Invoice\s*number\s+([A-Za-z0-9-]+)", "#HK7WPHRD-0001", id="cursor"),
+        pytest.param("du_text", r"(?:Your\s*)?bill\s*number\s*:?\s*([0-9]+)", "#0170948179", id="du"),
+    ])
+    def test_template_number(self, request, fixture, pattern, expected):
+        text = request.getfixturevalue(fixture)
+        assert extract_invoice_number(text, {"invoice_number_pattern": pattern}) == expected
 
 
 class TestInvoiceNumberGeneric:
@@ -1,37 +1,35 @@
 """Tests for filename generation."""
 
 import pytest
-import sys
-import os
 from datetime import date
 from decimal import Decimal
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
 from core.models import InvoiceData
 from core.naming import generate_filename
 
+# InvoiceData is frozen, so constant inputs can be shared across tests
+_AWS_DATA = InvoiceData(
+    supplier="AWS",
+    invoice_number="#2030491957",
+    invoice_date=date(2025, 2, 1),
+    amount=Decimal("592.37"),
+    currency="USD",
+)
+_UNKNOWN_DATA = InvoiceData(supplier="Unknown")
+
 
 class TestBasicNaming:
     """Test basic filename generation."""
 
     def test_full_data(self):
-        data = InvoiceData(
-            supplier="AWS",
-            invoice_number="#2030491957",
-            invoice_date=date(2025, 2, 1),
-            amount=Decimal("592.37"),
-            currency="USD",
-        )
-        result = generate_filename(data, "original.pdf")
+        result = generate_filename(_AWS_DATA, "original.pdf")
         assert result == "AWS_#2030491957_01-02-2025_592.37USD.pdf"
 
     def test_missing_fields(self):
-        data = InvoiceData(supplier="Unknown")
-        result = generate_filename(data, "test.pdf")
+        result = generate_filename(_UNKNOWN_DATA, "test.pdf")
         assert result == "Unknown_NoNum_NoDate_0.00XXX.pdf"
 
-    def test_accounting_prefix(self):
+    def test_accounting_prefix(self, filename_re):
         data = InvoiceData(
             supplier="Etisalat",
             invoice_number="#INV123",
@@ -43,18 +41,11 @@ class TestBasicNaming:
             data, "PUR 25-0024_old.pdf",
             accounting_prefix="PUR 25-0024_",
         )
-        assert result.startswith("PUR 25-0024_Etisalat_")
-        assert result.endswith(".pdf")
+        m = filename_re.fullmatch(result)
+        assert m and m["prefix"] == "PUR 25-0024_" and m["supplier"] == "Etisalat"
 
     def test_vat_quarter(self):
-        data = InvoiceData(
-            supplier="AWS",
-            invoice_number="#123",
-            invoice_date=date(2025, 3, 15),
-            amount=Decimal("100.00"),
-            currency="USD",
-        )
-        result = generate_filename(data, "test.pdf", vat_quarter="Q1-2025")
+        result = generate_filename(_AWS_DATA, "test.pdf", vat_quarter="Q1-2025")
         assert "Q1-2025" in result
 
     def test_special_characters_cleaned(self):
@@ -67,9 +58,7 @@ class TestBasicNaming:
         )
         result = generate_filename(data, "test.pdf")
         # Should not contain special chars like &, accented chars, or /
-        assert '&' not in result
-        assert 'é' not in result
-        assert '/' not in result
+        assert not set('&é/') & set(result)
 
     def test_preserves_extension(self):
         data = InvoiceData(supplier="Test")
@@ -95,3 +84,26 @@ class TestAccountingPrefix:
         data = InvoiceData(supplier="Vendor", invoice_number="#123")
         result = generate_filename(data, "test.pdf")
         assert result.startswith("Vendor_")
+
+
+class TestUniqueFilename:
+    """Test collision handling when a target directory is given."""
+
+    def test_free_name_unchanged(self, tmp_path):
+        data = InvoiceData(supplier="Vendor", invoice_number="1")
+        result = generate_filename(data, "test.pdf", dirpath=str(tmp_path))
+        assert result == "Vendor_1_NoDate_0.00XXX.pdf"
+
+    def test_counter_skips_existing_names(self, tmp_path):
+        data = InvoiceData(supplier="Vendor", invoice_number="1")
+        (tmp_path / "Vendor_1_NoDate_0.00XXX.pdf").touch()
+        (tmp_path / "Vendor_1_NoDate_0.00XXX_1.pdf").touch()
+        result = generate_filename(data, "test.pdf", dirpath=str(tmp_path))
+        assert result == "Vendor_1_NoDate_0.00XXX_2.pdf"
+
+    def test_sees_files_added_between_calls(self, tmp_path):
+        data = InvoiceData(supplier="Vendor", invoice_number="1")
+        first = generate_filename(data, "test.pdf", dirpath=str(tmp_path))
+        (tmp_path / first).touch()
+        second = generate_filename(data, "test.pdf", dirpath=str(tmp_path))
+        assert second == "Vendor_1_NoDate_0.00XXX_1.pdf"
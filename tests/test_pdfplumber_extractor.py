@@ -0,0 +1,115 @@
+"""Tests for native PDF text extraction page handling."""
+
+from unittest.mock import MagicMock
+
+import core.text.pdfplumber_extractor as extractor
+from core.text.pdfplumber_extractor import _extract_pages
+
+
+def _text_pdf(pages):
+    """Minimal native PDF with one Helvetica text line per entry of each page."""
+    count = len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            " ".join(f"{3 + 2 * i} 0 R" for i in range(count)), count),
+    ]
+    font = 3 + 2 * count
+    for i, lines in enumerate(pages):
+        content = "BT /F1 10 Tf 40 800 Td 12 TL " + " ".join(f"({l}) '" for l in lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode('latin-1')
+
+
+def _fake_pdf(page_texts):
+    pdf = MagicMock()
+    pdf.pages = []
+    for text in page_texts:
+        page = MagicMock()
+        page.extract_text.return_value = text
+        pdf.pages.append(page)
+    return pdf
+
+
+class TestExtractPages:
+    """Test page-level short-circuit of pdfplumber extraction."""
+
+    def test_all_pages_joined_under_limit(self):
+        pdf = _fake_pdf(['page one', None, 'page three'])
+        assert _extract_pages(pdf, max_chars=1000) == 'page one\npage three'
+
+    def test_stops_after_max_chars_then_adds_last_page(self):
+        pdf = _fake_pdf(['a' * 60, 'b' * 60, 'c' * 60, 'd' * 60])
+        text = _extract_pages(pdf, max_chars=100)
+        assert text == '\n'.join(['a' * 60, 'b' * 60, 'd' * 60])
+        pdf.pages[2].extract_text.assert_not_called()
+
+    def test_last_page_not_repeated(self):
+        pdf = _fake_pdf(['a' * 60, 'b' * 60])
+        assert _extract_pages(pdf, max_chars=100) == 'a' * 60 + '\n' + 'b' * 60
+
+    def test_page_cache_flushed(self):
+        pdf = _fake_pdf(['text'])
+        _extract_pages(pdf, max_chars=1000)
+        pdf.pages[0].flush_cache.assert_called_once()
+
+
+class TestPdfiumFastPath:
+    """Test PDFium-first extraction with pdfplumber fallback."""
+
+    def test_pdfium_text_used_when_usable(self, monkeypatch):
+        monkeypatch.setattr(extractor, '_pdfium_text', lambda source, max_chars: 'Invoice text')
+        monkeypatch.setattr(extractor, 'pdfplumber', None)
+        assert extractor.extract_text_from_pdf_bytes(b'%PDF-1.4') == 'Invoice text'
+
+    def test_falls_back_to_pdfplumber(self, monkeypatch):
+        monkeypatch.setattr(extractor, '_pdfium_text', lambda source, max_chars: '')
+        fake_plumber = MagicMock()
+        fake_plumber.open.return_value.__enter__.return_value = _fake_pdf(['from plumber'])
+        monkeypatch.setattr(extractor, 'pdfplumber', fake_plumber)
+        assert extractor.extract_text_from_pdf_path('x.pdf') == 'from plumber'
+
+    def test_unreadable_pdf_gives_empty_text(self):
+        assert extractor._pdfium_text(b'not a pdf', max_chars=1000) == ''
+
+    def test_pdfium_calls_hold_lock(self, monkeypatch):
+        held = []
+
+        def fake_document(source):
+            held.append(extractor._PDFIUM_LOCK.locked())
+            raise ValueError('unreadable')
+
+        monkeypatch.setattr(extractor.pdfium, 'PdfDocument', fake_document)
+        assert extractor._pdfium_text(b'%PDF-1.4', max_chars=1000) == ''
+        assert held == [True]
+        assert not extractor._PDFIUM_LOCK.locked()
+
+
+class TestLongNativePdf:
+    """Test that the total on the last page of a long PDF survives the text cap."""
+
+    def test_total_on_last_page_is_extracted(self):
+        from decimal import Decimal
+        from core.extractors.date_amount import extract_amount_and_currency
+
+        body = [f"Line item {n} consulting services 1 x 100.00" for n in range(60)]
+        pages = [["Acme Ltd Tax Invoice"] + body] + [body] * 10 + [["Total Payable AED 694.08"]]
+        text = extractor.extract_text_from_pdf_bytes(_text_pdf(pages), max_chars=5000)
+
+        assert text.endswith("Total Payable AED 694.08")
+        assert extract_amount_and_currency(text) == (Decimal("694.08"), "AED")
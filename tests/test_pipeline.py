@@ -1,17 +1,17 @@
 """Integration tests for the full pipeline."""
 
 import pytest
-import sys
 import os
+import re
 from datetime import date
 from decimal import Decimal
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
 from core.pipeline import InvoicePipeline
 
+_VAT_QUARTER_RE = re.compile(r'Q[1-4]-\d{4}')
+
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def pipeline():
     config_dir = os.path.join(os.path.dirname(__file__), '..', 'config')
     return InvoicePipeline(
@@ -21,73 +21,62 @@ def pipeline():
     )
 
 
+_END_TO_END_CASES = [
+    pytest.param("etisalat_text", "PUR 25-0024_old.pdf", {
+        "supplier": "Etisalat", "invoice_number": "#INV1965257146",
+        "invoice_date": date(2025, 1, 15), "amount": Decimal("960.34"), "currency": "AED",
+    }, id="etisalat"),
+    pytest.param("aws_text", "invoice.pdf", {
+        "supplier": "AWS", "invoice_number": "#2030491957",
+        "invoice_date": date(2025, 2, 1), "amount": Decimal("592.37"), "currency": "USD",
+    }, id="aws"),
+    pytest.param("zoho_text", "zoho_inv.pdf", {
+        "supplier": "ZOHO", "invoice_number": "#131898257",
+        "invoice_date": date(2023, 7, 7), "amount": Decimal("2100.00"), "currency": "USD",
+    }, id="zoho"),
+    pytest.param("cursor_text", "cursor_invoice.pdf", {
+        "supplier": "Cursor", "invoice_number": "#HK7WPHRD-0001",
+        "invoice_date": date(2025, 4, 10), "currency": "USD",
+    }, id="cursor"),
+    pytest.param("hilton_text", "hilton.pdf", {
+        "supplier": "Hilton", "invoice_date": date(2025, 1, 3), "currency": "AED",
+    }, id="hilton"),
+    pytest.param("du_text", "du_bill.pdf", {
+        "supplier": "DU", "invoice_date": date(2024, 12, 22), "currency": "AED",
+    }, id="du"),
+    pytest.param("french_text", "amazon_fr.pdf", {
+        "supplier": "Amazon", "invoice_date": date(2024, 3, 15),
+        "amount": Decimal("263.97"), "currency": "EUR",
+    }, id="french"),
+    pytest.param("webkul_text", "webkul.pdf", {
+        "supplier": "Webkul_Software_Pvt_Ltd", "currency": "USD",
+    }, id="webkul"),
+]
+
+
 class TestPipelineEndToEnd:
     """End-to-end pipeline tests using process_text."""
 
-    def test_etisalat_full(self, pipeline, etisalat_text):
+    @pytest.mark.parametrize("fixture_name, filename, expected", _END_TO_END_CASES)
+    def test_full(self, pipeline, request, fixture_name, filename, expected):
+        result = pipeline.process_text(request.getfixturevalue(fixture_name), filename)
+        for field, value in expected.items():
+            assert getattr(result.invoice_data, field) == value, field
+
+    def test_etisalat_naming(self, pipeline, etisalat_text, filename_re):
         result = pipeline.process_text(etisalat_text, "PUR 25-0024_old.pdf")
-        assert result.invoice_data.supplier == "Etisalat"
-        assert result.invoice_data.invoice_number == "#INV1965257146"
-        assert result.invoice_data.invoice_date == date(2025, 1, 15)
-        assert result.invoice_data.currency == "AED"
-        assert result.invoice_data.amount is not None
-        assert float(result.invoice_data.amount) == pytest.approx(960.34, abs=0.01)
         assert result.accounting_prefix == "PUR 25-0024_"
         assert result.vat_quarter == "Q4-2024"  # January = Q4 of previous year
-        assert result.new_filename.startswith("PUR 25-0024_")
-        assert "Etisalat" in result.new_filename
+        m = filename_re.fullmatch(result.new_filename)
+        assert m and m["prefix"] == "PUR 25-0024_" and m["supplier"] == "Etisalat"
         assert result.invoice_data.confidence > 0.8
 
-    def test_aws_full(self, pipeline, aws_text):
+    def test_aws_naming(self, pipeline, aws_text):
         result = pipeline.process_text(aws_text, "invoice.pdf")
-        assert result.invoice_data.supplier == "AWS"
-        assert result.invoice_data.invoice_number == "#2030491957"
-        assert result.invoice_data.invoice_date == date(2025, 2, 1)
-        assert result.invoice_data.currency == "USD"
-        assert float(result.invoice_data.amount) == pytest.approx(592.37, abs=0.01)
         assert result.vat_quarter == "Q1-2025"
         assert "AWS" in result.new_filename
         assert result.invoice_data.confidence >= 0.9
 
-    def test_zoho_full(self, pipeline, zoho_text):
-        result = pipeline.process_text(zoho_text, "zoho_inv.pdf")
-        assert result.invoice_data.supplier == "ZOHO"
-        assert result.invoice_data.invoice_number == "#131898257"
-        assert result.invoice_data.invoice_date == date(2023, 7, 7)
-        assert result.invoice_data.currency == "USD"
-        assert float(result.invoice_data.amount) == pytest.approx(2100.00, abs=0.01)
-
-    def test_cursor_full(self, pipeline, cursor_text):
-        result = pipeline.process_text(cursor_text, "cursor_invoice.pdf")
-        assert result.invoice_data.supplier == "Cursor"
-        assert result.invoice_data.invoice_number == "#HK7WPHRD-0001"
-        assert result.invoice_data.invoice_date == date(2025, 4, 10)
-        assert result.invoice_data.currency == "USD"
-
-    def test_hilton_full(self, pipeline, hilton_text):
-        result = pipeline.process_text(hilton_text, "hilton.pdf")
-        assert result.invoice_data.supplier == "Hilton"
-        assert result.invoice_data.invoice_date == date(2025, 1, 3)
-        assert result.invoice_data.currency == "AED"
-
-    def test_du_full(self, pipeline, du_text):
-        result = pipeline.process_text(du_text, "du_bill.pdf")
-        assert result.invoice_data.supplier == "DU"
-        assert result.invoice_data.invoice_date == date(2024, 12, 22)
-        assert result.invoice_data.currency == "AED"
-
-    def test_french_invoice_full(self, pipeline, french_text):
-        result = pipeline.process_text(french_text, "amazon_fr.pdf")
-        assert result.invoice_data.supplier == "Amazon"
-        assert result.invoice_data.invoice_date == date(2024, 3, 15)
-        assert result.invoice_data.currency == "EUR"
-        assert float(result.invoice_data.amount) == pytest.approx(263.97, abs=0.01)
-
-    def test_webkul_full(self, pipeline, webkul_text):
-        result = pipeline.process_text(webkul_text, "webkul.pdf")
-        assert result.invoice_data.supplier == "Webkul_Software_Pvt_Ltd"
-        assert result.invoice_data.currency == "USD"
-
 
 class TestPipelineConfidence:
     """Test confidence scoring."""
@@ -106,6 +95,24 @@ class TestPipelineConfidence:
         # Has date and amount but no supplier or invoice number
         assert 0.3 <= result.invoice_data.confidence <= 0.7
 
+    def test_reprocess_without_text_rescores(self, pipeline, aws_text):
+        result = pipeline.process_text(aws_text)
+        before = result.invoice_data.confidence
+        result.raw_text = None
+        result.invoice_data = result.invoice_data.model_copy(update={'supplier': 'Unknown'})
+
+        updated = pipeline.reprocess_with_supplier(result, supplier_name="AWS")
+
+        assert updated.invoice_data.supplier == "AWS"
+        assert updated.invoice_data.confidence == before
+
+    def test_invoice_data_is_frozen(self, pipeline, aws_text):
+        from pydantic import ValidationError
+
+        result = pipeline.process_text(aws_text)
+        with pytest.raises(ValidationError):
+            result.invoice_data.supplier = "Other"
+
 
 class TestPipelineFilenameFormat:
     """Test generated filename format."""
@@ -123,7 +130,123 @@ class TestPipelineFilenameFormat:
 
     def test_no_vat_quarter(self, pipeline, aws_text):
         result = pipeline.process_text(aws_text, "test.pdf", include_vat_quarter=False)
-        assert "Q1" not in result.new_filename
-        assert "Q2" not in result.new_filename
-        assert "Q3" not in result.new_filename
-        assert "Q4" not in result.new_filename
+        assert not _VAT_QUARTER_RE.search(result.new_filename)
+
+
+class TestPipelineFileValidation:
+    """Test that bad files are rejected before text extraction."""
+
+    def test_missing_file(self, pipeline, tmp_path):
+        result = pipeline.process_file(str(tmp_path / "missing.pdf"))
+        assert result.errors == ["File not found"]
+
+    def test_empty_file(self, pipeline, tmp_path):
+        path = tmp_path / "empty.pdf"
+        path.touch()
+        result = pipeline.process_file(str(path))
+        assert result.errors == ["File is empty (0 bytes)"]
+
+    def test_pdf_without_header(self, pipeline, tmp_path):
+        path = tmp_path / "fake.pdf"
+        path.write_bytes(b"<html>not a pdf</html>")
+        result = pipeline.process_file(str(path))
+        assert result.errors == ["Not a valid PDF file (missing PDF header)"]
+
+
+class TestPipelineUniqueName:
+    """Test that new filenames are only made unique when asked to."""
+
+    _AWS_NAME = "AWS_#2030491957_01-02-2025_592.37USD_Q1-2025.pdf"
+
+    @pytest.fixture
+    def named_copy(self, pipeline, aws_text, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            pipeline.text_extractor, 'extract_from_path', lambda path: (aws_text, "pdfplumber")
+        )
+        path = tmp_path / self._AWS_NAME
+        path.write_bytes(b"%PDF-1.4 stub")
+        return str(path)
+
+    def test_suffix_added_in_user_directory(self, pipeline, named_copy):
+        result = pipeline.process_file(named_copy)
+        assert result.new_filename == self._AWS_NAME.replace(".pdf", "_1.pdf")
+
+    def test_temporary_copy_keeps_its_name(self, pipeline, named_copy):
+        result = pipeline.process_file(named_copy, unique_name=False)
+        assert result.new_filename == self._AWS_NAME
+
+
+class TestPipelineProcessBytes:
+    """Test processing in-memory file content."""
+
+    def test_empty_bytes(self, pipeline):
+        result = pipeline.process_bytes(b"", "invoice.pdf")
+        assert result.errors == ["File is empty (0 bytes)"]
+        assert result.original_filename == "invoice.pdf"
+
+    def test_pdf_without_header(self, pipeline):
+        result = pipeline.process_bytes(b"<html></html>", "invoice.pdf")
+        assert result.errors == ["Not a valid PDF file (missing PDF header)"]
+
+    def test_image_without_vision_client(self, pipeline):
+        result = pipeline.process_bytes(b"\x89PNG...", "scan.png")
+        assert result.errors[0].startswith("Text extraction failed")
+
+
+class TestPipelineVisionFactory:
+    """Test that the Vision client is only built when OCR is needed."""
+
+    def test_factory_called_once_on_first_ocr(self):
+        calls = []
+        pipeline = InvoicePipeline(vision_client_factory=lambda: calls.append(1) or object())
+
+        assert pipeline.text_extractor.has_vision
+        pipeline.process_bytes(b"<html></html>", "invoice.pdf")
+        assert calls == []
+
+        pipeline.process_bytes(b"\x89PNG...", "scan.png")
+        pipeline.process_bytes(b"\x89PNG...", "scan.png")
+        assert calls == [1]
+
+    def test_factory_retried_after_failure(self):
+        clients = [None, "client"]
+        pipeline = InvoicePipeline(vision_client_factory=lambda: clients.pop(0))
+
+        assert pipeline.text_extractor.vision_client is None
+        assert pipeline.text_extractor.has_vision
+        assert pipeline.text_extractor.vision_client == "client"
+        assert pipeline.text_extractor.vision_client == "client"
+
+    def test_batch_worker_builds_client_lazily(self, monkeypatch):
+        import core.pipeline
+        from core.pipeline import _create_vision_client, _init_batch_worker
+
+        monkeypatch.setattr(core.pipeline, '_worker_pipeline', None)
+        _init_batch_worker(None, None, _create_vision_client)
+
+        extractor = core.pipeline._worker_pipeline.text_extractor
+        assert extractor.has_vision
+        assert extractor._vision_client is None
+
+
+class TestPipelineBatch:
+    """Test parallel batch processing."""
+
+    def test_batch_preserves_order(self, pipeline, tmp_path):
+        empty = tmp_path / "empty.pdf"
+        empty.touch()
+        fake = tmp_path / "fake.pdf"
+        fake.write_bytes(b"not a pdf")
+        paths = [str(tmp_path / "missing.pdf"), str(empty), str(fake)] * 3
+
+        results = pipeline.process_batch(paths, max_workers=2)
+
+        assert [r.errors for r in results] == [
+            ["File not found"],
+            ["File is empty (0 bytes)"],
+            ["Not a valid PDF file (missing PDF header)"],
+        ] * 3
+
+    def test_single_worker_runs_inline(self, pipeline, tmp_path):
+        results = pipeline.process_batch([str(tmp_path / "missing.pdf")], max_workers=1)
+        assert results[0].errors == ["File not found"]
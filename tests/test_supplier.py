@@ -1,15 +1,13 @@
 """Tests for supplier extraction."""
 
+import json
 import pytest
-import sys
 import os
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from core.extractors.supplier import SupplierExtractor, _compile_template
 
-from core.extractors.supplier import SupplierExtractor
 
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def extractor():
     config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'suppliers.json')
     return SupplierExtractor(config_path=config_path)
@@ -56,6 +54,106 @@ class TestSupplierTemplateMatching:
         assert template is not None
 
 
+class TestSupplierTemplateCompilation:
+    """Test that template regexes are compiled once at load time."""
+
+    def test_patterns_precompiled(self, extractor, etisalat_text):
+        name, template = extractor.extract(etisalat_text)
+        assert template["_invoice_number_re"].search(etisalat_text).group(1) == "INV1965257146"
+        by_priority = sorted(template["amount_patterns"], key=lambda p: p.get("priority", 99))
+        assert [r.pattern for r in template["_amount_res"]] == [p["pattern"] for p in by_priority]
+
+    def test_amount_patterns_compiled_in_priority_order(self):
+        template = {"amount_patterns": [
+            {"pattern": r"Subtotal\s*(\S+)", "priority": 3},
+            {"pattern": r"Grand Total\s*(\S+)", "priority": 1},
+            {"pattern": r"Balance\s*(\S+)"},
+            {"pattern": r"Total Due\s*(\S+)", "priority": 2},
+        ]}
+        _compile_template(template)
+        assert [r.pattern for r in template["_amount_res"]] == [
+            r"Grand Total\s*(\S+)", r"Total Due\s*(\S+)", r"Subtotal\s*(\S+)", r"Balance\s*(\S+)",
+        ]
+
+
+class TestSupplierTemplatePriority:
+    """Test that config order decides between several matching templates."""
+
+    @pytest.fixture
+    def config_path(self, tmp_path):
+        path = tmp_path / "suppliers.json"
+        path.write_text(json.dumps({
+            "suppliers": [
+                {"id": "first", "display_name": "First", "detection_patterns": ["Shared Holdings"]},
+                {"id": "second", "display_name": "Second", "detection_patterns": ["Second Brand", "Shared"]},
+            ],
+            "own_companies": [],
+        }))
+        return str(path)
+
+    def test_earliest_template_wins(self, config_path):
+        extractor = SupplierExtractor(config_path=config_path)
+        name, template = extractor.extract("Second Brand\nA unit of Shared Holdings")
+        assert name == "First"
+
+    def test_case_insensitive(self, config_path):
+        extractor = SupplierExtractor(config_path=config_path)
+        name, template = extractor.extract("second brand invoice")
+        assert name == "Second"
+
+    def test_linear_fallback_without_automaton(self, config_path, monkeypatch):
+        monkeypatch.setattr('core.extractors.supplier.AHOCORASICK_AVAILABLE', False)
+        extractor = SupplierExtractor(config_path=config_path)
+        assert extractor._automaton is None
+        name, template = extractor.extract("Second Brand\nA unit of Shared Holdings")
+        assert name == "First"
+
+    @pytest.mark.parametrize("automaton", [True, False], ids=["automaton", "linear"])
+    def test_empty_pattern_never_matches(self, config_path, monkeypatch, automaton):
+        monkeypatch.setattr('core.extractors.supplier.AHOCORASICK_AVAILABLE', automaton)
+        extractor = SupplierExtractor(config_path=config_path)
+        extractor.register_template({"id": "blank", "display_name": "Blank", "detection_patterns": [""]})
+        assert extractor.extract("Unrelated Vendor LLC")[1] is None
+
+    def test_reloads_after_config_change(self, config_path):
+        assert SupplierExtractor(config_path=config_path).extract("Third Party Co")[1] is None
+        with open(config_path) as f:
+            config = json.load(f)
+        config["suppliers"].append(
+            {"id": "third", "display_name": "Third", "detection_patterns": ["Third Party"]}
+        )
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+        name, template = SupplierExtractor(config_path=config_path).extract("Third Party Co")
+        assert name == "Third"
+
+    def test_register_template(self, config_path):
+        extractor = SupplierExtractor(config_path=config_path)
+        learned = {"id": "third", "display_name": "Third", "detection_patterns": ["Third Party"]}
+
+        assert extractor.register_template(learned)
+        assert not extractor.register_template(learned)
+        assert extractor.extract("Third Party Co")[0] == "Third"
+        # Config order still wins over the learned template
+        assert extractor.extract("Third Party of Shared Holdings")[0] == "First"
+        # The cached config is left untouched
+        assert SupplierExtractor(config_path=config_path).extract("Third Party Co")[1] is None
+
+    def test_concurrent_registrations_all_kept(self, config_path):
+        from concurrent.futures import ThreadPoolExecutor
+
+        extractor = SupplierExtractor(config_path=config_path)
+        learned = [
+            {"id": f"vendor{i}", "display_name": f"Vendor{i}", "detection_patterns": [f"Vendor Nr {i}"]}
+            for i in range(20)
+        ]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert all(pool.map(extractor.register_template, learned))
+
+        assert {t["id"] for t in extractor.templates} >= {t["id"] for t in learned}
+        assert extractor.extract("Vendor Nr 7 invoice")[0] == "Vendor7"
+
+
 class TestSupplierHeuristic:
     """Test heuristic fallback for unknown suppliers."""
 
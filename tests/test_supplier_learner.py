@@ -2,17 +2,14 @@
 
 import json
 import os
-import shutil
-import sys
-import tempfile
 
 import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
 from core.extractors.supplier_learner import (
     build_detection_patterns,
     create_supplier_template,
+    non_empty_lines,
+    prompt_supplier_info,
     save_supplier_template,
 )
 from core.extractors.supplier import SupplierExtractor
@@ -34,6 +31,24 @@ Invoice #999
 Total: $50.00
 """
 
+_BASE_CONFIG_JSON = json.dumps({
+    "suppliers": [
+        {"id": "existing", "display_name": "Existing", "detection_patterns": ["existing"]}
+    ],
+    "own_companies": []
+})
+
+
+class TestNonEmptyLines:
+    """Test lazy line iteration."""
+
+    def test_strips_and_skips_blank_lines(self):
+        text = "  First \n\n\t\nSecond\r\nThird"
+        assert list(non_empty_lines(text)) == ["First", "Second", "Third"]
+
+    def test_empty_text(self):
+        assert list(non_empty_lines("")) == []
+
 
 class TestBuildDetectionPatterns:
     """Test auto-detection of patterns from invoice text."""
@@ -78,6 +93,12 @@ class TestCreateSupplierTemplate:
         )
         assert "custom-pattern-1" in template["detection_patterns"]
 
+    def test_custom_patterns_not_mutated(self):
+        patterns = ["custom-pattern"]
+        template = create_supplier_template("My Vendor", SAMPLE_TEXT, detection_patterns=patterns)
+        assert template["detection_patterns"] == ["My Vendor", "custom-pattern"]
+        assert patterns == ["custom-pattern"]
+
     def test_supplier_name_added_to_patterns_if_missing(self):
         template = create_supplier_template(
             "Xyz Unique",
@@ -93,51 +114,109 @@ class TestCreateSupplierTemplate:
 class TestSaveSupplierTemplate:
     """Test persisting templates to suppliers.json."""
 
-    def setup_method(self):
-        """Create a temporary config file for each test."""
-        self.tmpdir = tempfile.mkdtemp()
-        self.config_path = os.path.join(self.tmpdir, "suppliers.json")
-        config = {
-            "suppliers": [
-                {"id": "existing", "display_name": "Existing", "detection_patterns": ["existing"]}
-            ],
-            "own_companies": []
-        }
-        with open(self.config_path, 'w') as f:
-            json.dump(config, f)
+    @pytest.fixture
+    def config_path(self, tmp_path):
+        path = tmp_path / "suppliers.json"
+        path.write_text(_BASE_CONFIG_JSON)
+        return str(path)
 
-    def teardown_method(self):
-        shutil.rmtree(self.tmpdir)
-
-    def test_saves_new_supplier(self):
+    def test_saves_new_supplier(self, config_path):
         template = {
             "id": "new_vendor",
             "display_name": "New_Vendor",
             "detection_patterns": ["New Vendor Corp"],
         }
-        result = save_supplier_template(template, config_path=self.config_path)
+        result = save_supplier_template(template, config_path=config_path)
         assert result is True
 
-        with open(self.config_path) as f:
+        with open(config_path) as f:
             config = json.load(f)
         ids = [s['id'] for s in config['suppliers']]
         assert "new_vendor" in ids
 
-    def test_rejects_duplicate(self):
+    def test_write_leaves_no_temp_file(self, config_path, tmp_path):
+        template = {"id": "acme", "display_name": "Acme", "detection_patterns": ["Acme"]}
+        save_supplier_template(template, config_path=config_path)
+
+        assert os.listdir(tmp_path) == ["suppliers.json"]
+        with open(config_path, encoding='utf-8') as f:
+            assert f.read().endswith('}\n')
+
+    def test_write_keeps_file_mode(self, config_path):
+        os.chmod(config_path, 0o640)
+        template = {"id": "acme", "display_name": "Acme", "detection_patterns": ["Acme"]}
+        save_supplier_template(template, config_path=config_path)
+
+        assert os.stat(config_path).st_mode & 0o777 == 0o640
+
+    def test_concurrent_saves_all_kept(self, config_path):
+        from concurrent.futures import ThreadPoolExecutor
+
+        templates = [
+            {"id": f"vendor{i}", "display_name": f"Vendor{i}", "detection_patterns": [f"Vendor {i}"]}
+            for i in range(20)
+        ]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            saved = list(pool.map(lambda t: save_supplier_template(t, config_path=config_path), templates))
+
+        assert all(saved)
+        with open(config_path) as f:
+            ids = {s['id'] for s in json.load(f)['suppliers']}
+        assert ids >= {t['id'] for t in templates}
+
+    def test_rejects_duplicate(self, config_path):
         template = {
             "id": "existing",
             "display_name": "Existing",
             "detection_patterns": ["existing"],
         }
-        result = save_supplier_template(template, config_path=self.config_path)
+        result = save_supplier_template(template, config_path=config_path)
         assert result is False
 
-    def test_saved_supplier_is_detected(self):
+    def test_saved_supplier_is_detected(self, config_path):
         """End-to-end: save a template, then verify SupplierExtractor finds it."""
         template = create_supplier_template("Acme Corp", SAMPLE_TEXT, default_currency="USD")
-        save_supplier_template(template, config_path=self.config_path)
+        save_supplier_template(template, config_path=config_path)
 
-        extractor = SupplierExtractor(config_path=self.config_path)
+        extractor = SupplierExtractor(config_path=config_path)
         name, tmpl = extractor.extract(SAMPLE_TEXT)
         assert "Acme" in name
         assert tmpl is not None
+
+    def test_learned_supplier_is_detected_in_memory(self, config_path):
+        """A learned template is detected without saving and reloading the config."""
+        extractor = SupplierExtractor(config_path=config_path)
+        template = create_supplier_template("Acme Corp", SAMPLE_TEXT, default_currency="USD")
+        extractor.register_template(template)
+
+        name, tmpl = extractor.extract(SAMPLE_TEXT)
+        assert "Acme" in name
+        assert tmpl["default_currency"] == "USD"
+
+
+class TestPromptSupplierInfo:
+    """Test the interactive learning prompt."""
+
+    @pytest.fixture
+    def answers(self, monkeypatch):
+        import core.extractors.supplier_learner as learner
+
+        monkeypatch.setattr(learner, 'save_supplier_template', lambda template: True)
+
+        def set_answers(*values):
+            replies = iter(values)
+            monkeypatch.setattr('builtins.input', lambda prompt='': next(replies))
+        return set_answers
+
+    def test_on_saved_called_when_saved(self, answers):
+        saved = []
+        answers("Acme Corp", "USD", "y", "y")
+        template = prompt_supplier_info(SAMPLE_TEXT, on_saved=saved.append)
+        assert saved == [template]
+
+    def test_on_saved_not_called_when_declined(self, answers):
+        saved = []
+        answers("Acme Corp", "USD", "y", "n")
+        template = prompt_supplier_info(SAMPLE_TEXT, on_saved=saved.append)
+        assert template["id"] == "acme_corp"
+        assert saved == []
@@ -0,0 +1,87 @@
+"""Tests for Vision OCR batching (mocked — no real API calls)."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+
+pytest.importorskip('google.cloud.vision')
+
+
+def _fake_batch_response(texts):
+    batch = MagicMock()
+    batch.responses = []
+    for text in texts:
+        response = MagicMock()
+        response.error.message = ''
+        response.full_text_annotation.text = text
+        batch.responses.append(response)
+    return batch
+
+
+class TestOcrImages:
+    """Test that page images are sent to Vision in batches."""
+
+    def test_pages_batched_in_groups_of_16(self):
+        from core.text.vision_ocr import ocr_images
+
+        images = [Image.new('RGB', (10, 10), 'white') for _ in range(20)]
+        client = MagicMock()
+        client.batch_annotate_images.side_effect = lambda requests: _fake_batch_response(
+            ["page"] * len(requests)
+        )
+
+        text = ocr_images(client, images)
+
+        assert client.batch_annotate_images.call_count == 2
+        sizes = [len(c.kwargs['requests']) for c in client.batch_annotate_images.call_args_list]
+        assert sorted(sizes) == [4, 16]
+        assert text.count('page') == 20
+
+    def test_text_kept_in_page_order(self):
+        from core.text.vision_ocr import ocr_images
+
+        images = [Image.new('L', (10, 10)) for _ in range(3)]
+        client = MagicMock()
+        client.batch_annotate_images.return_value = _fake_batch_response(['one', 'two', 'three'])
+
+        assert ocr_images(client, images) == 'one\ntwo\nthree'
+
+    def test_batches_keep_page_order_when_concurrent(self):
+        from core.text.vision_ocr import ocr_images
+
+        images = [Image.new('RGB', (10, 10)) for _ in range(40)]
+        client = MagicMock()
+        client.batch_annotate_images.side_effect = lambda requests: _fake_batch_response(
+            [f"p{len(requests)}"] * len(requests)
+        )
+
+        text = ocr_images(client, images)
+
+        assert client.batch_annotate_images.call_count == 3
+        assert text.split('\n') == ['p16'] * 32 + ['p8'] * 8
+
+    def test_grayscale_pages_sent_as_grayscale_jpeg(self):
+        import io
+        from core.text.vision_ocr import ocr_images
+
+        client = MagicMock()
+        client.batch_annotate_images.return_value = _fake_batch_response(['x'])
+
+        ocr_images(client, [Image.new('L', (10, 10))])
+
+        request = client.batch_annotate_images.call_args.kwargs['requests'][0]
+        sent = Image.open(io.BytesIO(request.image.content))
+        assert sent.format == 'JPEG'
+        assert sent.mode == 'L'
+
+    def test_api_error_raises(self):
+        from core.text.vision_ocr import ocr_images
+
+        client = MagicMock()
+        batch = _fake_batch_response(['x'])
+        batch.responses[0].error.message = 'quota exceeded'
+        client.batch_annotate_images.return_value = batch
+
+        with pytest.raises(Exception, match='quota exceeded'):
+            ocr_images(client, [Image.new('RGB', (10, 10))])